@@ -0,0 +1,306 @@
+import argparse
+import os
+import struct
+import sys
+import time
+import wave
+import zlib
+import numpy as np
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(ROOT, "spiro"), os.path.join(ROOT, "chladni-claude")]
+
+import pygame
+import scenes
+from modes import colormap_indices, colormap_lut, mode_vector
+from poster import png_chunk
+
+# Chladni patterns and spirographs driven by a WAV file. The audio is read
+# in fixed-size chunks into a ring buffer holding the last WINDOW samples,
+# and every frame takes a windowed FFT of the buffer at the playback
+# position and sums it into frequency bands. Nothing grows with the length
+# of the track: only the ring buffer and one FFT's worth of scratch are
+# kept. Played live, the frames follow the mixer's playback position;
+# offline (--output), frames are rendered at fixed times as fast as they go.
+
+# Samples in each FFT, and samples read from the file at a time
+WINDOW = 2048
+CHUNK = 1024
+# Frequency bands, log spaced between these edges in Hz
+BANDS = 8
+MIN_HZ, MAX_HZ = 40.0, 16000.0
+# Band levels span this many dB below the band's recent peak
+DYNAMIC_RANGE = 24.0
+# How fast the remembered peak of a band falls, in dB per second
+PEAK_FALL = 6.0
+# A band's peak stays within this many dB of the loudest band's, so bands
+# with next to nothing in them stay dark instead of being turned up
+PEAK_SPREAD = 40.0
+# Time constants in seconds of the band levels rising and falling
+ATTACK, RELEASE = 0.02, 0.25
+FPS = 30
+# zlib level of the offline frames; pygame's PNG encoder (level 6) takes
+# several times longer than drawing a frame
+COMPRESSION = 1
+
+# One Chladni mode per band, low modes for the low bands; the (m, n), (n, m)
+# pairs give the symmetric figures of a square plate
+CHLADNI_MODES = [(1, 2), (2, 1), (2, 3), (3, 2), (3, 5), (5, 3), (5, 7), (7, 5)]
+CHLADNI_SIZE = (600, 600)
+SPIRO_SIZE = (800, 600)
+
+# Mono float32 samples from a PCM WAV file, read a chunk at a time
+class WavStream:
+    def __init__(self, path):
+        self.file = wave.open(path, "rb")
+        self.rate = self.file.getframerate()
+        self.channels = self.file.getnchannels()
+        self.width = self.file.getsampwidth()
+        self.length = self.file.getnframes()
+        self.position = 0  # Next frame to be read
+
+    def seek(self, frame):
+        self.file.setpos(min(max(frame, 0), self.length))
+        self.position = self.file.tell()
+
+    # Up to `count` samples, fewer at the end of the file
+    def read(self, count):
+        data = self.file.readframes(count)
+        if self.width == 1:
+            samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+        elif self.width == 3:
+            raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            samples = ((raw[:, 0] | raw[:, 1] << 8 | raw[:, 2] << 16) << 8 >> 8) / np.float32(1 << 23)
+        else:
+            kind = np.int16 if self.width == 2 else np.int32
+            samples = np.frombuffer(data, dtype=kind) / np.float32(np.iinfo(kind).max + 1)
+        samples = samples.astype(np.float32).reshape(-1, self.channels).mean(axis=1)
+        self.position += len(samples)
+        return samples
+
+    def close(self):
+        self.file.close()
+
+# The last `size` samples pushed
+class RingBuffer:
+    def __init__(self, size):
+        self.data = np.zeros(size, dtype=np.float32)
+        self.end = 0  # Where the next sample goes; the oldest sample is here
+
+    def push(self, samples):
+        size = len(self.data)
+        if len(samples) >= size:
+            self.data[:] = samples[-size:]
+            self.end = 0
+            return
+        first = min(len(samples), size - self.end)
+        self.data[self.end:self.end + first] = samples[:first]
+        self.data[:len(samples) - first] = samples[first:]
+        self.end = (self.end + len(samples)) % size
+
+    # The samples oldest first, written into `out`
+    def ordered(self, out):
+        tail = len(self.data) - self.end
+        out[:tail] = self.data[self.end:]
+        out[tail:] = self.data[:self.end]
+        return out
+
+# Band levels in 0..1 of a WavStream at any playback time, moving forward
+class BandAnalyzer:
+    def __init__(self, stream, window=WINDOW, bands=BANDS):
+        self.stream = stream
+        self.ring = RingBuffer(window)
+        self.frame = np.empty(window, dtype=np.float32)
+        self.taper = np.hanning(window).astype(np.float32)
+        # FFT bins of each band; every band gets at least one bin
+        frequencies = np.fft.rfftfreq(window, 1 / stream.rate)
+        edges = np.geomspace(MIN_HZ, min(MAX_HZ, stream.rate / 2), bands + 1)
+        self.starts = np.searchsorted(frequencies, edges[:-1])
+        self.stops = np.maximum(np.searchsorted(frequencies, edges[1:]), self.starts + 1)
+        self.peaks = np.full(bands, -np.inf)
+        self.levels = np.zeros(bands)
+        self.time = 0.0
+
+    # Read up to sample `position`, skipping ahead when more than a window
+    # would be read
+    def advance(self, position):
+        position = min(position, self.stream.length)
+        if position - self.stream.position > len(self.ring.data):
+            self.stream.seek(position - len(self.ring.data))
+        while self.stream.position < position:
+            samples = self.stream.read(min(CHUNK, position - self.stream.position))
+            if not len(samples):
+                break
+            self.ring.push(samples)
+
+    def levels_at(self, seconds):
+        self.advance(int(seconds * self.stream.rate))
+        frame = self.ring.ordered(self.frame)
+        frame *= self.taper
+        power = np.abs(np.fft.rfft(frame)) ** 2
+        total = np.concatenate(([0.0], np.cumsum(power)))
+        energy = (total[self.stops] - total[self.starts]) / (self.stops - self.starts)
+        decibels = 10 * np.log10(energy + 1e-12)
+
+        # Levels are relative to each band's recent peak, so quiet tracks and
+        # quiet bands still move the scene
+        elapsed = max(seconds - self.time, 0.0)
+        self.time = seconds
+        self.peaks = np.maximum(self.peaks - PEAK_FALL * elapsed, decibels)
+        np.maximum(self.peaks, self.peaks.max() - PEAK_SPREAD, out=self.peaks)
+        target = np.clip(1 + (decibels - self.peaks) / DYNAMIC_RANGE, 0, 1)
+        rising = target > self.levels
+        rate = np.where(rising, 1 - np.exp(-elapsed / ATTACK), 1 - np.exp(-elapsed / RELEASE))
+        self.levels += (target - self.levels) * rate
+        return self.levels
+
+# The bands weight one Chladni mode each
+class ChladniScene:
+    size = CHLADNI_SIZE
+
+    def __init__(self):
+        width, height = self.size
+        self.x_basis = np.stack([mode_vector(m, 1.0, width) for m, _ in CHLADNI_MODES]).astype(np.float32)
+        self.y_basis = np.stack([mode_vector(n, 1.0, height) for _, n in CHLADNI_MODES], axis=1).astype(np.float32)
+        self.weighted = np.empty_like(self.y_basis)
+        self.field = np.empty((height, width), dtype=np.float32)
+        self.lut = colormap_lut("RdBu")
+
+    def draw(self, surface, levels):
+        np.multiply(self.y_basis, levels.astype(np.float32), out=self.weighted)
+        np.matmul(self.weighted, self.x_basis, out=self.field)
+        # Loud passages reach the ends of the colormap, quiet ones stay pale
+        limit = max(float(np.abs(self.field).max()), 1.0)
+        pygame.surfarray.blit_array(surface, self.lut[colormap_indices(self.field, limit)].swapaxes(0, 1))
+
+# The bass, mid and treble bands set the sliders of spirograph.py (R, r, d)
+# or compound_spirograph.py (R1, R2, r, d). The radii move in steps of
+# STEP, which keeps the curves short enough to draw every frame.
+class SpirographScene:
+    size = SPIRO_SIZE
+    STEP = 10
+
+    def __init__(self, compound):
+        self.compound = compound
+
+    def value(self, level, low, high, step=None):
+        value = low + (high - low) * level
+        return value if step is None else round(value / step) * step
+
+    def draw(self, surface, levels):
+        bass, low_mid, high_mid, treble = (levels[i:i + 2].mean() for i in range(0, len(levels), 2))
+        surface.fill((0, 0, 0))
+        if self.compound:
+            R1 = self.value(bass, 200, 350, self.STEP)
+            R2 = self.value(low_mid, 50, 200, self.STEP)
+            r = self.value(high_mid, 20, 100, self.STEP)
+            d = self.value(treble, 5, 100)
+            points = scenes.compound_spirograph_points(self.size, R1, R2, r, d)
+        else:
+            R = self.value(bass, 150, 300, self.STEP)
+            r = self.value((low_mid + high_mid) / 2, 20, 100, self.STEP)
+            d = self.value(treble, 10, 100)
+            points = scenes.spirograph_points(self.size, R, r, d)
+        scenes.draw_curve(surface, points)
+
+def make_scene(name):
+    if name == "chladni":
+        return ChladniScene()
+    return SpirographScene(compound=name == "compound")
+
+# Play the track and draw the scene at the mixer's playback position; without
+# an audio device, follow the wall clock silently
+def play(path, scene, fps):
+    stream = WavStream(path)
+    analyzer = BandAnalyzer(stream)
+    duration = stream.length / stream.rate
+    pygame.init()
+    screen = pygame.display.set_mode(scene.size)
+    pygame.display.set_caption(f"Audio reactive: {os.path.basename(path)}")
+    try:
+        pygame.mixer.init(frequency=stream.rate)
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.play()
+        mixer = True
+    except pygame.error as error:
+        print(f"No audio output ({error}); playing silently")
+        mixer = False
+
+    clock = pygame.time.Clock()
+    start = time.perf_counter()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        if mixer:
+            seconds = pygame.mixer.music.get_pos() / 1000
+            playing = pygame.mixer.music.get_busy()
+        else:
+            seconds = time.perf_counter() - start
+            playing = seconds < duration
+        if not playing:
+            break
+        scene.draw(screen, analyzer.levels_at(seconds))
+        pygame.display.flip()
+        clock.tick(fps)
+    stream.close()
+    pygame.quit()
+
+def save_frame(surface, path, level=COMPRESSION):
+    width, height = surface.get_size()
+    # Every scanline starts with filter type 0 (none)
+    scanlines = np.zeros((height, 1 + width * 3), dtype=np.uint8)
+    scanlines[:, 1:] = np.frombuffer(pygame.image.tobytes(surface, "RGB"), dtype=np.uint8).reshape(height, -1)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(png_chunk(b"IDAT", zlib.compress(scanlines.tobytes(), level)))
+        f.write(png_chunk(b"IEND", b""))
+
+# Render a frame every 1 / fps seconds of the track into `directory` as
+# frame_00000.png, ...; returns the number of frames and the seconds spent
+# on analysis and in total
+def render_frames(path, scene, fps, directory, level=COMPRESSION):
+    os.makedirs(directory, exist_ok=True)
+    stream = WavStream(path)
+    analyzer = BandAnalyzer(stream)
+    surface = pygame.Surface(scene.size)
+    frame_count = int(stream.length / stream.rate * fps)
+    analysis = 0.0
+    start = time.perf_counter()
+    for index in range(frame_count):
+        before = time.perf_counter()
+        levels = analyzer.levels_at(index / fps)
+        analysis += time.perf_counter() - before
+        scene.draw(surface, levels)
+        save_frame(surface, os.path.join(directory, f"frame_{index:05d}.png"), level)
+    stream.close()
+    return frame_count, analysis, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drive a Chladni pattern or a spirograph with the frequency bands of a WAV file."
+    )
+    parser.add_argument("wav", help="PCM WAV file")
+    parser.add_argument("--scene", choices=["chladni", "spirograph", "compound"], default="chladni")
+    parser.add_argument("--fps", type=int, default=FPS)
+    parser.add_argument("--output", "-o", help="render PNG frames into this directory instead of playing")
+    parser.add_argument("--compression", type=int, default=COMPRESSION, help="zlib level 0-9 of the frames")
+    args = parser.parse_args()
+
+    scene = make_scene(args.scene)
+    if args.output is None:
+        play(args.wav, scene, args.fps)
+        return
+
+    frames, analysis, seconds = render_frames(args.wav, scene, args.fps, args.output, args.compression)
+    audio = frames / args.fps
+    print(f"Rendered {frames} frames ({audio:.1f} s of audio) in {seconds:.1f} s, "
+          f"{audio / seconds:.1f}x real time; analysis {1000 * analysis / max(frames, 1):.2f} ms per frame")
+
+
+if __name__ == "__main__":
+    main()
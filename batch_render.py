@@ -0,0 +1,163 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Render without a window; the spirograph scenes only need plain surfaces
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(ROOT, "spiro"), os.path.join(ROOT, "chladni-claude")]
+
+import scenes
+from scenes import BASE_SIZE
+
+# Parameters of every scene, with the scripts' slider start values as defaults
+SCENES = dict(
+    scenes.SCENES,
+    # Up to three more modes can be added with m2/n2, m3/n3 and m4/n4
+    chladni={"m": 2, "n": 3, "a": 1.0, "b": 1.0},
+)
+CHLADNI_EXTRA_MODES = ["m2", "n2", "m3", "n3", "m4", "n4"]
+
+def parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+# "R=100,150,200" or the inclusive range "R=100:300:50"
+def parse_param(text):
+    name, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUES, got {text!r}")
+    if ":" in values:
+        start, stop, step = (parse_value(v) for v in values.split(":"))
+        count = int(round((stop - start) / step)) + 1
+        return name, [start + i * step for i in range(count)]
+    return name, [parse_value(v) for v in values.split(",")]
+
+def parse_size(text):
+    width, _, height = text.partition("x")
+    return int(width), int(height)
+
+# Parameter sets listed in a JSON file (a list of objects) or a CSV file
+def read_list(path):
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            return [{k: parse_value(v) for k, v in row.items()} for row in csv.DictReader(f)]
+        return json.load(f)
+
+def file_name(scene, params):
+    values = "_".join(f"{name}={value:g}" for name, value in params.items())
+    return f"{scene}_{values}.png"
+
+def render_spirograph_scene(scene, params, size, path):
+    import pygame
+
+    scale = min(size[0] / BASE_SIZE[0], size[1] / BASE_SIZE[1])
+    surface = pygame.Surface(size)
+    surface.fill((0, 0, 0))
+    p = params
+    if scene == "spirograph":
+        scenes.draw_curve(surface, scenes.spirograph_points(size, p["R"], p["r"], p["d"], scale))
+    elif scene == "compound":
+        points = scenes.compound_spirograph_points(size, p["R1"], p["R2"], p["r"], p["d"], scale)
+        scenes.draw_curve(surface, points)
+    elif scene == "spirograph3d":
+        points, depths = scenes.spirograph_3d_points(size, p["R"], p["r"], p["d"], p["tilt"], scale)
+        scenes.draw_depth_curve(surface, points, depths)
+    elif scene == "compound3d":
+        points, colors, depths = scenes.compound_spirograph_3d_points(
+            size, p["R1"], p["R2"], p["r"], p["d"], p["tilt_x"], p["tilt_y"], scale
+        )
+        scenes.draw_depth_curve(surface, points, depths, colors, 2)
+    elif scene == "wireframe":
+        points, depths = scenes.wireframe_points(size, p["R1"], p["R2"], p["r"], p["d"], p["angle"], scale)
+        scenes.draw_wireframe(surface, points, depths)
+    pygame.image.save(surface, path)
+
+def render_chladni(params, size, path):
+    import numpy as np
+    from matplotlib.image import imsave
+    from modes import combined_pattern
+
+    modes = [(params["m"], params["n"])]
+    for i in range(2, 5):
+        if f"m{i}" in params or f"n{i}" in params:
+            modes.append((params.get(f"m{i}", 2), params.get(f"n{i}", 3)))
+    pattern = combined_pattern(modes, params["a"], params["b"], *size)
+
+    # Symmetric color range so the nodal lines (zero) land on the middle color
+    limit = np.abs(pattern).max() or 1.0
+    imsave(path, pattern, cmap="RdBu", vmin=-limit, vmax=limit)
+
+# Runs in the worker processes
+def render(job):
+    scene, params, size, path = job
+    if scene == "chladni":
+        render_chladni(params, size, path)
+    else:
+        render_spirograph_scene(scene, params, size, path)
+    return path
+
+def build_jobs(args, parser):
+    defaults = SCENES[args.scene]
+    allowed = set(defaults) | (set(CHLADNI_EXTRA_MODES) if args.scene == "chladni" else set())
+
+    if args.list:
+        entries = read_list(args.list)
+    else:
+        names = [name for name, _ in args.param]
+        grids = [values for _, values in args.param]
+        entries = [dict(zip(names, combo)) for combo in itertools.product(*grids)]
+
+    jobs = []
+    for entry in entries:
+        unknown = set(entry) - allowed
+        if unknown:
+            parser.error(f"unknown parameter(s) for {args.scene}: {', '.join(sorted(unknown))}")
+        params = {**defaults, **entry}
+        path = os.path.join(args.output, file_name(args.scene, params))
+        if args.skip_existing and os.path.exists(path):
+            continue
+        jobs.append((args.scene, params, args.size, path))
+    return jobs
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render spirograph and Chladni images to PNG without opening a window."
+    )
+    parser.add_argument("scene", choices=sorted(SCENES))
+    parser.add_argument("--param", "-p", action="append", type=parse_param, default=[],
+                        help="NAME=v1,v2,... or NAME=start:stop:step (inclusive); "
+                             "several --param options render every combination")
+    parser.add_argument("--list", help="JSON list of objects or CSV file of parameter sets")
+    parser.add_argument("--size", type=parse_size, default=BASE_SIZE, help="WIDTHxHEIGHT (default 800x600)")
+    parser.add_argument("--output", "-o", default="renders", help="output directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--skip-existing", action="store_true", help="do not re-render existing files")
+    args = parser.parse_args()
+    if args.list and args.param:
+        parser.error("use either --param or --list, not both")
+
+    jobs = build_jobs(args, parser)
+    os.makedirs(args.output, exist_ok=True)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        chunksize = max(1, len(jobs) // (args.workers * 8))
+        for done, path in enumerate(executor.map(render, jobs, chunksize=chunksize), 1):
+            print(f"[{done}/{len(jobs)}] {path}")
+    elapsed = time.perf_counter() - start
+    if jobs:
+        print(f"Rendered {len(jobs)} images in {elapsed:.1f}s ({len(jobs) / elapsed * 3600:.0f} per hour)")
+
+
+if __name__ == "__main__":
+    main()
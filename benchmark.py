@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+
+# Time every script's drawing without a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SPIRO = os.path.join(ROOT, "spiro")
+CHLADNI = os.path.join(ROOT, "chladni-claude")
+sys.path[:0] = [SPIRO, CHLADNI]
+# pygame_gui warns that some of the scripts' labels are a few pixels short
+warnings.filterwarnings("ignore", "Label Rect is too small", UserWarning)
+
+# Slider settings each script is timed with: its start values, then settings
+# with many loops and with large, fast loops
+SPIRO_CASES = {
+    "spirograph.py": [(200, 50, 80), (290, 11, 95), (300, 97, 40)],
+    "compound_spirograph.py": [(250, 150, 50, 30), (340, 190, 13, 90), (120, 55, 45, 100)],
+    "3d_spirograph.py": [(200, 50, 80, 45), (290, 11, 95, 10), (300, 97, 40, 80)],
+    "3d_compound_spirograph.py": [(250, 150, 50, 30, 30, 30), (340, 190, 13, 90, 60, 20),
+                                  (120, 55, 45, 100, 5, 85)],
+    "3d_wireframe_compound_spirograph.py": [(250, 150, 50, 30), (340, 190, 13, 90), (120, 55, 45, 100)],
+}
+# Modes put into the four slots of chladni.py, one slider move per frame
+CHLADNI_CASES = [[(2, 3), (3, 2), (1, 4), (5, 5)], [(9, 10), (10, 7), (6, 9), (8, 8)]]
+# Field sizes timed for the combined pattern alone
+FIELD_SIZES = [500, 2000]
+
+class _Captured(Exception):
+    pass
+
+# Runs a spirograph script up to its main loop and returns the arguments it
+# would have called app_loop.run() with, by name
+def load_script(name):
+    import inspect
+    import runpy
+    import app_loop
+
+    captured = {}
+    run = app_loop.run
+
+    # Takes whatever run() takes, so new arguments of run() need no change here
+    def capture(*args, **kwargs):
+        arguments = inspect.signature(run).bind(*args, **kwargs)
+        arguments.apply_defaults()
+        captured.update(arguments.arguments)
+        raise _Captured
+
+    app_loop.run = capture
+    try:
+        runpy.run_path(os.path.join(SPIRO, name), run_name="__main__")
+    except _Captured:
+        pass
+    finally:
+        app_loop.run = run
+    return captured
+
+def summarize(name, params, profiler):
+    stages = profiler.stage_ms()
+    frame_ms = sum(stages.values())
+    points = profiler.mean_counts().get("points", 0)
+    result = {
+        "case": name,
+        "params": params,
+        "frames": len(profiler.frames),
+        "ms_per_frame": round(frame_ms, 3),
+        "stages_ms": {stage: round(ms, 3) for stage, ms in sorted(stages.items())},
+    }
+    if points:
+        result["points"] = round(points)
+        result["points_per_second"] = round(points / frame_ms * 1000)
+    return result
+
+# Every frame regenerates the scene: the curve caches are emptied first, so
+# cached scripts are timed on a cache miss, and progressive scenes are drawn
+# through to the finished curve. Scripts that draw on a background worker
+# have it stopped and are timed running its stages on this thread, to time
+# the work rather than the wait.
+def bench_spirograph(name, cases, frames):
+    import profiling
+    from progressive import ProgressiveCurve
+
+    app = load_script(name)
+    screen, manager, draw = app["screen"], app["manager"], app["draw"]
+    cache = draw.__globals__.get("curve_cache")
+    worker = draw.__globals__.get("worker")
+    if worker is not None:
+        worker.close()
+
+        def draw(*params):
+            return ProgressiveCurve.draw(worker, screen, params)
+
+    results = []
+    for params in cases:
+        profiler = profiling.enable(window=frames)
+        while draw(*params):  # Warm up
+            pass
+        profiler.clear()
+        for _ in range(frames):
+            if cache is not None:
+                cache.clear()
+            if worker is not None:
+                worker.key = None
+            with profiling.stage("scene"):
+                screen.fill((0, 0, 0))
+                while draw(*params):
+                    pass
+            with profiling.stage("ui"):
+                manager.draw_ui(screen)
+            profiling.end_frame()
+        results.append(summarize(name, list(params), profiler))
+    profiling.disable()
+    return results
+
+# The slider path of chladni.py: one mode slider moves per frame, then the
+# coalesced flush updates the field and blits the image
+def bench_chladni(cases, frames):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import runpy
+    import profiling
+
+    app = runpy.run_path(os.path.join(CHLADNI, "chladni.py"))
+    names = app["flush"].__globals__  # The script's live globals
+    names["fig"].canvas.draw()
+    superposition = names["superposition"]
+    set_slot, redraw = superposition.set_slot, names["redraw"]
+
+    def timed_set_slot(i, mode):
+        with profiling.stage("field"):
+            return set_slot(i, mode)
+
+    def timed_redraw():
+        with profiling.stage("draw"):
+            redraw()
+
+    superposition.set_slot = timed_set_slot
+    names["redraw"] = timed_redraw
+
+    results = []
+    for modes in cases:
+        profiler = profiling.enable(window=frames)
+        for frame in range(frames + 1):
+            if frame == 1:
+                profiler.clear()  # The first frame sets up all four slots
+            if frame == 0:
+                for i, (m, n) in enumerate(modes):
+                    names["m_sliders"][i].set_val(m)
+                    names["n_sliders"][i].set_val(n)
+            else:
+                # Every timed frame moves a slot to a new mode: m + 1, then back
+                i = frame % 4
+                m = modes[i][0]
+                slider = names["m_sliders"][i]
+                slider.set_val((m + 1) % 11 if slider.val == m else m)
+            with profiling.stage("update"):
+                names["flush"]()
+            profiling.end_frame()
+        results.append(summarize("chladni.py", [list(mode) for mode in modes], profiler))
+    profiling.disable()
+    return results
+
+def bench_fields(sizes, frames):
+    from modes import combined_pattern
+
+    results = []
+    modes = CHLADNI_CASES[0]
+    for size in sizes:
+        start = time.perf_counter()
+        for _ in range(frames):
+            combined_pattern(modes, 1.0, 1.0, size, size)
+        ms = (time.perf_counter() - start) / frames * 1000
+        results.append({"case": "modes.combined_pattern", "params": [size, size], "frames": frames,
+                        "ms_per_frame": round(ms, 3), "stages_ms": {"field": round(ms, 3)},
+                        "points": size * size, "points_per_second": round(size * size / ms * 1000)})
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results):
+    for result in results:
+        stages = "  ".join(f"{stage} {ms:.2f}" for stage, ms in
+                           sorted(result["stages_ms"].items(), key=lambda item: -item[1]))
+        rate = f"  {result['points_per_second'] / 1e6:.2f} Mpts/s" if "points_per_second" in result else ""
+        print(f"{result['case']:<38} {str(result['params']):<36} "
+              f"{result['ms_per_frame']:8.2f} ms{rate}\n    {stages}")
+
+# Change in frame time against an earlier JSON report, case by case
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r["case"], json.dumps(r["params"])): r["ms_per_frame"] for r in baseline["results"]}
+    print(f"\nAgainst {baseline_path} (commit {baseline.get('commit')}):")
+    for result in results:
+        old = before.get((result["case"], json.dumps(result["params"])))
+        if old:
+            new = result["ms_per_frame"]
+            print(f"{result['case']:<38} {str(result['params']):<36} "
+                  f"{old:8.2f} -> {new:8.2f} ms ({(new - old) / old * 100:+.0f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every script's drawing headlessly, stage by stage.")
+    parser.add_argument("--frames", type=int, default=10, help="frames timed per case")
+    parser.add_argument("--only", action="append", help="run only cases whose name contains this")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="JSON file from an earlier run to compare against")
+    args = parser.parse_args()
+
+    def wanted(name):
+        return not args.only or any(part in name for part in args.only)
+
+    results = []
+    for name, cases in SPIRO_CASES.items():
+        if wanted(name):
+            results += bench_spirograph(name, cases, args.frames)
+    if wanted("chladni.py"):
+        results += bench_chladni(CHLADNI_CASES, args.frames)
+    if wanted("modes.combined_pattern"):
+        results += bench_fields(FIELD_SIZES, args.frames)
+
+    print_results(results)
+    if args.json:
+        import numpy as np
+
+        report = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "frames": args.frames,
+            "results": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import os
+import numpy as np
+from modes import mode_pattern
+
+# Every (m, n) mode the sliders can reach, precomputed into one .npy file and
+# memory-mapped, so a mode is a zero-copy view into the page cache and later
+# sessions start from the file written by the first one. Atlases are keyed by
+# plate, resolution and dtype through their file name, so changing any of
+# them can never pick up a stale atlas.
+
+ATLAS_DIR = os.environ.get("CHLADNI_ATLAS_DIR",
+                           os.path.join(os.path.expanduser("~"), ".cache", "chladni"))
+# Modes 0..MODE_COUNT-1 along each axis, the range of the m and n sliders
+MODE_COUNT = 11
+# Least recently used atlases beyond this many are deleted
+MAX_ATLASES = 8
+
+# The plate's sides are written with repr(), which gives back exactly the
+# same float, so plates that differ at all get different files
+def atlas_path(kind, a, b, resolution, dtype):
+    name = f"{kind}_a={float(a)!r}_b={float(b)!r}_{resolution}_{np.dtype(dtype).name}.npy"
+    return os.path.join(ATLAS_DIR, name)
+
+# The atlas at `path` if it exists and has the expected shape and dtype
+def open_atlas(path, shape, dtype):
+    try:
+        atlas = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if atlas.shape != shape or atlas.dtype != dtype:
+        return None
+    os.utime(path)  # Mark as recently used
+    return atlas
+
+# Creates the atlas file and has fill(atlas) write the modes into it. The
+# file only appears under its final name once complete, so an interrupted
+# build is never used.
+def build_atlas(path, shape, dtype, fill):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = path + ".partial"
+    atlas = np.lib.format.open_memmap(partial, mode="w+", dtype=dtype, shape=shape)
+    fill(atlas)
+    atlas.flush()
+    del atlas
+    os.replace(partial, path)
+    prune_atlases()
+    return np.load(path, mmap_mode="r")
+
+def prune_atlases():
+    paths = [os.path.join(ATLAS_DIR, name) for name in os.listdir(ATLAS_DIR) if name.endswith(".npy")]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[MAX_ATLASES:]:
+        os.remove(path)
+
+# Read-only (MODE_COUNT, MODE_COUNT, resolution, resolution) atlas of the
+# simply supported a x b plate. With build=False, returns None instead of
+# computing a missing atlas.
+def plate_atlas(a, b, resolution, dtype=np.float32, build=True):
+    path = atlas_path("plate", a, b, resolution, dtype)
+    shape = (MODE_COUNT, MODE_COUNT, resolution, resolution)
+    atlas = open_atlas(path, shape, np.dtype(dtype))
+    if atlas is None and build:
+        def fill(atlas):
+            for m in range(MODE_COUNT):
+                for n in range(MODE_COUNT):
+                    atlas[m, n] = mode_pattern(m, n, a, b, resolution, resolution)
+
+        atlas = build_atlas(path, shape, dtype, fill)
+    return atlas
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the Chladni mode atlas for a plate ahead of time.")
+    parser.add_argument("-a", type=float, default=1.0, help="plate width")
+    parser.add_argument("-b", type=float, default=1.0, help="plate height")
+    parser.add_argument("--resolution", type=int, default=500)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    atlas = plate_atlas(args.a, args.b, args.resolution)
+    print(f"{atlas.filename}: {atlas.nbytes / 1e6:.0f} MB, ready in {time.perf_counter() - start:.2f}s")
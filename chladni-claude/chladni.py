@@ -1,39 +1,130 @@
-import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider, Button, CheckButtons
+from atlas import plate_atlas
+from modes import Superposition, mode_pattern
 
-def chladni_pattern(x, y, a, b, m, n):
-    return np.sin(m * np.pi * x / a) * np.sin(n * np.pi * y / b)
+# Mode currently selected in frequency slot i, or None when it is switched off
+def slot_mode(i):
+    if not freq_checkboxes[i].get_status()[0]:
+        return None
+    if PLATE == "free":
+        return int(m_sliders[i].val)  # Free plate modes are numbered by frequency
+    return int(m_sliders[i].val), int(n_sliders[i].val)
 
+# Mode atlas for the current plate: the solved modes of a free plate, or for
+# the simply supported plate the optional precomputed sin * sin modes. Only
+# the starting plate gets an atlas built (build=False); other shapes use one
+# if an earlier session (or atlas.py, plate_solver.py) left it on disk. A
+# free plate has no modes without one, so None means it is not solved yet.
+def plate_modes(build=True):
+    if PLATE == "free":
+        from plate_solver import free_plate_atlas
+
+        return free_plate_atlas(a, b, resolution, FREE_MODES, build=build)
+    return plate_atlas(a, b, resolution, build=build) if USE_ATLAS else None
+
+# Widget callbacks only record that something changed and schedule flush(),
+# so a burst of slider events is drawn once, with the latest state
 def update(val):
-    patterns = []
-    for i in range(4):
-        m, n = int(m_sliders[i].val), int(n_sliders[i].val)
-        pattern = chladni_pattern(X, Y, a, b, m, n)
-        patterns.append(pattern)
-    
-    combined_pattern = np.zeros_like(X)
-    for i, pattern in enumerate(patterns):
-        if freq_checkboxes[i].get_status()[0]:
-            combined_pattern += pattern
-    
-    im.set_array(combined_pattern)
+    global slots_dirty
+    slots_dirty = True
+    schedule_flush()
+
+def schedule_flush():
+    global flush_pending
+    if not flush_pending:
+        flush_pending = True
+        flush_timer.start()
+
+def flush():
+    global flush_pending, slots_dirty, plate_dirty
+    flush_pending = False
+    changed = False
+    if plate_dirty:
+        modes = plate_modes(build=False)
+        if PLATE == "free" and modes is None:
+            # Solving takes seconds, so the plate waits for the Solve button
+            set_status(f"a={a:.2f}, b={b:.2f} not solved yet: press Solve")
+        else:
+            superposition.set_plate(a, b, resolution, resolution, modes)
+            set_status("")
+            changed = True
+        plate_dirty = False
+    if slots_dirty:
+        # Only the slots that actually changed touch the combined field
+        for i in range(4):
+            changed |= superposition.set_slot(i, slot_mode(i))
+        slots_dirty = False
+
+    if changed:
+        im.set_array(superposition.field)
+    redraw()
+
+# Solves the current free plate, blocking for the seconds it takes
+def solve(event):
+    global plate_dirty
+    set_status(f"Solving a={a:.2f}, b={b:.2f}...")
+    fig.canvas.draw()
+    fig.canvas.flush_events()
+    superposition.set_plate(a, b, resolution, resolution, plate_modes())
+    plate_dirty = False
+    set_status("")
+    im.set_array(superposition.field)
     fig.canvas.draw_idle()
 
+# The title is not blitted, so changing it redraws the whole figure
+def set_status(text):
+    if ax.get_title() != text:
+        ax.set_title(text)
+        fig.canvas.draw_idle()
+
+# With blitting, only the image and the slider handles are drawn over a copy
+# of the rest of the figure instead of re-rendering every axes
+def redraw():
+    if background is None:
+        fig.canvas.draw_idle()
+        return
+    fig.canvas.restore_region(background)
+    draw_animated()
+    fig.canvas.blit(fig.bbox)
+
+def draw_animated():
+    for artist in animated_artists:
+        fig.draw_artist(artist)
+
+# Runs after every full draw (first show, resize, checkbox clicks) to take a
+# fresh copy of the static background
+def on_draw(event):
+    global background
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+    draw_animated()
+
 # Initial parameters
 a, b = 1.0, 1.0  # Plate dimensions
 resolution = 500
-
-# Create meshgrid
-x = np.linspace(0, a, resolution)
-y = np.linspace(0, b, resolution)
-X, Y = np.meshgrid(x, y)
+BLIT = True  # Set to False to redraw the whole figure on every change
+FLUSH_INTERVAL = 15  # ms to collect slider events before drawing
+# Read modes from a memory-mapped atlas (atlas.py) instead of the cached sine
+# vectors. Off by default: these modes are cheap to compute, and streaming
+# them from the atlas is slower than the rank-2 update
+USE_ATLAS = False
+# "supported" for the sin * sin modes of a simply supported plate, or "free"
+# for the modes of a plate with free edges, like a real Chladni plate, solved
+# by plate_solver.py (needs scipy; solving a new plate takes seconds, so after
+# the starting plate it waits for the Solve button)
+PLATE = "supported"
+FREE_MODES = 50
+if PLATE == "free":
+    resolution = 200  # Grid the modes are solved on
 
 # Set up the figure and initial plot
 fig, ax = plt.subplots(figsize=(10, 8))
 plt.subplots_adjust(left=0.1, bottom=0.35)
 
-initial_pattern = chladni_pattern(X, Y, a, b, 2, 3)
+if PLATE == "free":
+    initial_pattern = plate_modes()[2]
+else:
+    initial_pattern = mode_pattern(2, 3, a, b, resolution, resolution)
 im = ax.imshow(initial_pattern, cmap='RdBu', interpolation='nearest', aspect='equal')
 plt.colorbar(im)
 
@@ -47,7 +138,12 @@ for i in range(4):
     ax_n = plt.axes([0.1, 0.20 - i*0.05, 0.65, 0.03])
     ax_checkbox = plt.axes([0.85, 0.225 - i*0.05, 0.05, 0.05])
     
-    m_slider = Slider(ax_m, f'm{i+1}', 0, 10, valinit=2, valstep=1)
+    if PLATE == "free":
+        # One slider picks the mode number
+        m_slider = Slider(ax_m, f'mode{i+1}', 0, FREE_MODES - 1, valinit=2, valstep=1)
+        ax_n.set_visible(False)
+    else:
+        m_slider = Slider(ax_m, f'm{i+1}', 0, 10, valinit=2, valstep=1)
     n_slider = Slider(ax_n, f'n{i+1}', 0, 10, valinit=3, valstep=1)
     checkbox = CheckButtons(ax_checkbox, [f'F{i+1}'], [True])
     
@@ -59,6 +155,12 @@ for i in range(4):
     n_slider.on_changed(update)
     checkbox.on_clicked(update)
 
+# Combined pattern of the four slots, updated incrementally by update(),
+# with its modes read from the plate's atlas if it has one
+superposition = Superposition(4, a, b, resolution, resolution, plate_modes())
+for i in range(4):
+    superposition.set_slot(i, slot_mode(i))
+
 # Create sliders for plate dimensions
 ax_a = plt.axes([0.1, 0.05, 0.65, 0.03])
 ax_b = plt.axes([0.1, 0.1, 0.65, 0.03])
@@ -66,12 +168,10 @@ a_slider = Slider(ax_a, 'a', 0.1, 2.0, valinit=1.0)
 b_slider = Slider(ax_b, 'b', 0.1, 2.0, valinit=1.0)
 
 def update_dimensions(val):
-    global a, b, X, Y
+    global a, b, plate_dirty
     a, b = a_slider.val, b_slider.val
-    x = np.linspace(0, a, resolution)
-    y = np.linspace(0, b, resolution)
-    X, Y = np.meshgrid(x, y)
-    update(val)
+    plate_dirty = True
+    schedule_flush()
 
 a_slider.on_changed(update_dimensions)
 b_slider.on_changed(update_dimensions)
@@ -89,4 +189,27 @@ def reset(event):
 
 reset_button.on_clicked(reset)
 
-plt.show()
\ No newline at end of file
+if PLATE == "free":
+    solve_ax = plt.axes([0.91, 0.025, 0.08, 0.04])
+    solve_button = Button(solve_ax, 'Solve')
+    solve_button.on_clicked(solve)
+
+# Redraw state
+slots_dirty = plate_dirty = flush_pending = False
+background = None
+flush_timer = fig.canvas.new_timer(interval=FLUSH_INTERVAL)
+flush_timer.single_shot = True
+flush_timer.add_callback(flush)
+
+animated_artists = []
+if BLIT and fig.canvas.supports_blit:
+    animated_artists = [im]
+    for slider in m_sliders + n_sliders + [a_slider, b_slider]:
+        slider.drawon = False  # flush() blits the moved handle instead
+        # The filled bar, the value and the axes' lines, which hold the handle
+        animated_artists += [slider.poly, slider.valtext] + list(slider.ax.lines)
+    for artist in animated_artists:
+        artist.set_animated(True)
+    fig.canvas.mpl_connect('draw_event', on_draw)
+
+plt.show()
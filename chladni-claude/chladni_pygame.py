@@ -0,0 +1,152 @@
+import argparse
+import os
+import time
+import tracemalloc
+import numpy as np
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from modes import colormap_lut, mode_vector
+
+# Animated Chladni plate: every mode oscillates as cos(w_mn t) at its own
+# frequency, so the nodal pattern keeps changing instead of showing the
+# static sum of chladni.py. Drawn with pygame at the display's frame rate.
+#
+# A frame is one weighted sum of the precomputed float32 modes, done as a
+# single (width, k) @ (k, height) BLAS product into a preallocated field,
+# then colormapped in place through a lookup table of pixel values and
+# pushed with surfarray.blit_array. The buffers are laid out (x, y) like
+# surfarray, and every step writes into them, so frames allocate nothing.
+
+FPS = 60
+# Angular frequency of mode (m, n) is SPEED * pi * ((m / a)^2 + (n / b)^2)
+# radians per second: like a plate's bending modes, frequency grows with
+# the square of the wave number
+SPEED = 0.1
+# Frames timed by --benchmark
+BENCHMARK_FRAMES = 300
+
+class ChladniAnimator:
+    def __init__(self, modes, a, b, width, height, surface, speed=SPEED, cmap="RdBu"):
+        self.width, self.height = width, height
+        modes = np.array(modes)
+        # x_basis[:, k] and y_basis[k] are the sine vectors of mode k
+        self.x_basis = np.stack([mode_vector(m, a, width) for m, _ in modes], axis=1).astype(np.float32)
+        self.y_basis = np.stack([mode_vector(n, b, height) for _, n in modes]).astype(np.float32)
+        self.omega = speed * np.pi * ((modes[:, 0] / a) ** 2 + (modes[:, 1] / b) ** 2)
+        self.enabled = np.ones(len(modes))
+
+        # Per-frame buffers
+        self.phase = np.empty(len(modes))
+        self.weights = np.empty(len(modes), dtype=np.float32)
+        self.weighted = np.empty_like(self.x_basis)
+        self.field = np.empty((width, height), dtype=np.float32)
+        self.index = np.empty((width, height), dtype=np.intp)
+        self.pixels = np.empty((width, height), dtype=np.uint32)
+
+        # Colormap as the surface's own pixel values
+        lut = colormap_lut(cmap)
+        self.levels = len(lut)
+        self.lut = np.array([surface.map_rgb(tuple(color)) for color in lut.tolist()], dtype=np.uint32)
+
+    def toggle(self, k):
+        if k < len(self.enabled):
+            self.enabled[k] = 1.0 - self.enabled[k]
+
+    # The field at time t, as surface pixel values in self.pixels
+    def render(self, t):
+        np.multiply(self.omega, t, out=self.phase)
+        np.cos(self.phase, out=self.phase)
+        np.multiply(self.phase, self.enabled, out=self.weights)
+        np.multiply(self.x_basis, self.weights, out=self.weighted)
+        np.matmul(self.weighted, self.y_basis, out=self.field)
+
+        # Symmetric color range so the nodal lines land on the middle color,
+        # binned like modes.colormap_indices
+        field = self.field
+        limit = max(float(field.max()), -float(field.min())) or 1.0
+        scale = self.levels / (2 * limit)
+        field *= scale
+        field += self.levels / 2
+        np.clip(field, 0, self.levels - 1, out=field)
+        np.copyto(self.index, field, casting="unsafe")
+        np.take(self.lut, self.index, out=self.pixels, mode="clip")
+        return self.pixels
+
+    def draw(self, surface, t):
+        pygame.surfarray.blit_array(surface, self.render(t))
+
+# Mean ms per frame over `frames` frames drawn onto an off-screen surface,
+# and the bytes allocated during them
+def benchmark(modes, a, b, size, speed, frames):
+    surface = pygame.Surface((size, size), depth=32)
+    animator = ChladniAnimator(modes, a, b, size, size, surface, speed)
+    animator.draw(surface, 0.0)  # Warm up
+    tracemalloc.start()
+    start = time.perf_counter()
+    for frame in range(frames):
+        animator.draw(surface, frame / FPS)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{size}x{size}, {len(modes)} modes: {seconds / frames * 1000:.2f} ms/frame "
+          f"({frames / seconds:.0f} fps), peak {peak} bytes allocated during {frames} frames")
+
+# Keys 1-9 switch modes on and off, space pauses, Escape quits
+def animate(modes, a, b, size, speed, fps):
+    pygame.init()
+    screen = pygame.display.set_mode((size, size))
+    animator = ChladniAnimator(modes, a, b, size, size, screen, speed)
+    clock = pygame.time.Clock()
+    t = 0.0
+    paused = False
+    last_caption = 0.0
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                pygame.quit()
+                return
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                paused = not paused
+            elif event.type == pygame.KEYDOWN and pygame.K_1 <= event.key <= pygame.K_9:
+                animator.toggle(event.key - pygame.K_1)
+
+        elapsed = clock.tick(fps) / 1000
+        if not paused:
+            t += elapsed
+        animator.draw(screen, t)
+        pygame.display.flip()
+        if t - last_caption >= 1.0 or paused:
+            last_caption = t
+            pygame.display.set_caption(f"Chladni modes {modes}: {clock.get_fps():.0f} fps")
+
+# "2,3" -> (2, 3)
+def parse_mode(text):
+    m, _, n = text.partition(",")
+    return int(m), int(n)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Animated Chladni plate with every mode oscillating at its own frequency."
+    )
+    parser.add_argument("--mode", type=parse_mode, action="append",
+                        help="M,N of a mode to add (repeatable, default 2,3 3,2 1,4 5,5)")
+    parser.add_argument("-a", type=float, default=1.0, help="plate width")
+    parser.add_argument("-b", type=float, default=1.0, help="plate height")
+    parser.add_argument("--size", type=int, default=800, help="window width and height in pixels")
+    parser.add_argument("--fps", type=int, default=FPS)
+    parser.add_argument("--speed", type=float, default=SPEED, help="scales every mode's frequency")
+    parser.add_argument("--benchmark", action="store_true", help="time frames off screen instead of animating")
+    parser.add_argument("--frames", type=int, default=BENCHMARK_FRAMES, help="frames timed with --benchmark")
+    args = parser.parse_args()
+    modes = args.mode or [(2, 3), (3, 2), (1, 4), (5, 5)]
+
+    if args.benchmark:
+        benchmark(modes, args.a, args.b, args.size, args.speed, args.frames)
+    else:
+        animate(modes, args.a, args.b, args.size, args.speed, args.fps)
+
+
+if __name__ == "__main__":
+    main()
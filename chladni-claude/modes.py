@@ -0,0 +1,115 @@
+from functools import lru_cache
+import numpy as np
+
+# Each mode is sin(m pi x / a) * sin(n pi y / b), a product of a function of
+# x and a function of y, so fields are built from cached 1D sine vectors
+# instead of full X/Y meshgrids.
+
+# sin(k pi x / length) at `resolution` points across the plate (read-only)
+@lru_cache(maxsize=256)
+def mode_vector(k, length, resolution):
+    x = np.linspace(0, length, resolution)
+    vector = np.sin(k * np.pi * x / length)
+    vector.flags.writeable = False
+    return vector
+
+# Mode (m, n) on a height x width grid, rows along y
+def mode_pattern(m, n, a, b, width, height):
+    return np.outer(mode_vector(n, b, height), mode_vector(m, a, width))
+
+# Sum of the (m, n) modes over a height x width grid covering the plate,
+# computed as one (height, k) @ (k, width) matrix product
+def combined_pattern(modes, a, b, width, height):
+    if not modes:
+        return np.zeros((height, width))
+    x_basis = np.stack([mode_vector(m, a, width) for m, _ in modes])
+    y_basis = np.stack([mode_vector(n, b, height) for _, n in modes])
+    return y_basis.T @ x_basis
+
+# Rows start:stop of combined_pattern(modes, a, b, width, height), for
+# rendering fields too large to hold in memory a band at a time
+def combined_rows(modes, a, b, width, height, start, stop, dtype=np.float64):
+    if not modes:
+        return np.zeros((stop - start, width), dtype=dtype)
+    x_basis = np.stack([mode_vector(m, a, width) for m, _ in modes]).astype(dtype)
+    y_basis = np.stack([mode_vector(n, b, height)[start:stop] for _, n in modes]).astype(dtype)
+    return y_basis.T @ x_basis
+
+# Matplotlib colormap as a (levels, 3) uint8 RGB lookup table
+def colormap_lut(name, levels=256):
+    from matplotlib import colormaps
+
+    return colormaps[name](np.linspace(0, 1, levels), bytes=True)[:, :3]
+
+# Field values in [-limit, limit] -> lookup table rows, binned like
+# matplotlib's own colormapping so the nodal lines land on the middle color
+def colormap_indices(field, limit, levels=256):
+    scaled = (np.asarray(field) + limit) * (levels / (2 * limit))
+    return np.clip(scaled, 0, levels - 1).astype(np.intp)
+
+# Combined field of a fixed number of mode slots, kept as persistent state.
+# Changing a slot subtracts its old mode and adds the new one in place, as a
+# single rank-2 update applied a block of rows at a time, so no full-size
+# temporaries are allocated. With a mode atlas (see atlas.py), modes are
+# added and subtracted straight from its memory-mapped views instead.
+class Superposition:
+    # Rebuild from scratch after this many in-place updates so rounding
+    # errors cannot pile up
+    REBUILD_INTERVAL = 1000
+    # Rows updated per block; small enough for the scratch block to stay in cache
+    BLOCK_ROWS = 16
+
+    def __init__(self, slots, a, b, width, height, atlas=None):
+        self.modes = [None] * slots  # (m, n) of each slot, None when disabled
+        self.set_plate(a, b, width, height, atlas)
+
+    # atlas[m, n] must be mode (m, n) of this plate at this size
+    def set_plate(self, a, b, width, height, atlas=None):
+        self.a, self.b, self.width, self.height = a, b, width, height
+        self.atlas = atlas
+        self.block = np.empty((self.BLOCK_ROWS, width))
+        self.rebuild()
+
+    def rebuild(self):
+        enabled = [mode for mode in self.modes if mode is not None]
+        if self.atlas is None:
+            self.field = combined_pattern(enabled, self.a, self.b, self.width, self.height)
+        else:
+            self.field = np.zeros((self.height, self.width))
+            for mode in enabled:
+                self.field += self.atlas[mode]
+        self.updates = 0
+
+    # Put mode (m, n), or None to disable, in slot i; returns whether the
+    # field changed
+    def set_slot(self, i, mode):
+        old = self.modes[i]
+        if old == mode:
+            return False
+        self.modes[i] = mode
+        self.updates += 1
+        if self.updates >= self.REBUILD_INTERVAL:
+            self.rebuild()
+            return True
+
+        if self.atlas is not None:
+            if old is not None:
+                self.field -= self.atlas[old]
+            if mode is not None:
+                self.field += self.atlas[mode]
+            return True
+
+        # field += y_basis @ x_basis, with the old mode's y vector negated
+        changes = [(old, -1.0), (mode, 1.0)]
+        x_rows, y_columns = [], []
+        for (m, n), sign in [(mn, sign) for mn, sign in changes if mn is not None]:
+            x_rows.append(mode_vector(m, self.a, self.width))
+            y_columns.append(sign * mode_vector(n, self.b, self.height))
+        x_basis = np.stack(x_rows)
+        y_basis = np.stack(y_columns, axis=1)
+        for row in range(0, self.height, self.BLOCK_ROWS):
+            rows = self.field[row:row + self.BLOCK_ROWS]
+            block = self.block[:len(rows)]
+            np.matmul(y_basis[row:row + self.BLOCK_ROWS], x_basis, out=block)
+            rows += block
+        return True
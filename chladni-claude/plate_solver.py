@@ -0,0 +1,116 @@
+from functools import lru_cache
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import LinearOperator, eigsh, splu
+from atlas import atlas_path, build_atlas, open_atlas
+
+# Modes of a plate with free edges, like a real centrally driven Chladni
+# plate, rather than the simply supported sin * sin modes in modes.py.
+#
+# The plate's bending energy
+#   1/2 * integral of w_xx^2 + w_yy^2 + 2 nu w_xx w_yy + 2 (1 - nu) w_xy^2
+# is discretized with finite differences into a sparse stiffness matrix K.
+# Minimizing the energy with nothing held fixed gives the free-edge boundary
+# conditions without writing them out. The modes solve K w = lambda M w, M
+# being the lumped mass of each grid node, and lambda = omega^2 with unit
+# bending stiffness and mass per area.
+
+POISSON_RATIO = 0.3  # Typical of the brass and steel plates Chladni used
+# A free plate can move without bending (shift and tilt in x and y), giving
+# three zero-frequency modes that are not drawn
+RIGID_MODES = 3
+# Shift-invert around a point just below zero, so K - SHIFT * M is positive
+# definite despite the rigid modes
+SHIFT = -1.0
+
+def second_difference(n, h):
+    return sparse.diags([1.0, -2.0, 1.0], [0, 1, 2], shape=(n - 2, n)) / h ** 2
+
+def first_difference(n, h):
+    return sparse.diags([-1.0, 1.0], [0, 1], shape=(n - 1, n)) / h
+
+# Sparse stiffness and mass matrices of an a x b plate on an nx x ny grid of
+# nodes, ordered row by row (index j * nx + i for node x_i, y_j)
+def plate_operators(a, b, nx, ny, nu=POISSON_RATIO):
+    hx, hy = a / (nx - 1), b / (ny - 1)
+    ix, iy = sparse.identity(nx), sparse.identity(ny)
+    sxx, syy = second_difference(nx, hx), second_difference(ny, hy)
+
+    dxx = sparse.kron(iy, sxx)  # w_xx at every node not on a left/right edge
+    dyy = sparse.kron(syy, ix)  # w_yy at every node not on a top/bottom edge
+    # Both at the interior nodes, for the w_xx * w_yy term
+    dxx_interior = sparse.kron(iy.tocsr()[1:-1], sxx)
+    dyy_interior = sparse.kron(syy, ix.tocsr()[1:-1])
+    dxy = sparse.kron(first_difference(ny, hy), first_difference(nx, hx))  # At cell centers
+
+    cross = dxx_interior.T @ dyy_interior
+    stiffness = (dxx.T @ dxx + dyy.T @ dyy + nu * (cross + cross.T)
+                 + 2 * (1 - nu) * dxy.T @ dxy) * (hx * hy)
+
+    # Lumped mass: each node carries its share of the plate's area
+    wx, wy = np.ones(nx), np.ones(ny)
+    wx[[0, -1]] = wy[[0, -1]] = 0.5
+    mass = sparse.diags(np.kron(wy, wx) * (hx * hy))
+    return stiffness.tocsc(), mass.tocsc()
+
+# Sparse LU factorization of K - SHIFT * M, reused by every eigensolve on the
+# same plate and grid
+@lru_cache(maxsize=8)
+def factorized_plate(a, b, nx, ny, nu=POISSON_RATIO):
+    stiffness, mass = plate_operators(a, b, nx, ny, nu)
+    lu = splu((stiffness - SHIFT * mass).tocsc(), permc_spec="COLAMD")
+    shape = stiffness.shape
+    inverse = LinearOperator(shape, matvec=lu.solve, dtype=np.float64)
+    return stiffness, mass, inverse
+
+# The k lowest bending modes as a (k, ny, nx) array, each scaled to a peak of
+# 1 with its largest value positive, and their angular frequencies
+@lru_cache(maxsize=8)
+def free_plate_modes(a, b, nx, ny, k, nu=POISSON_RATIO):
+    stiffness, mass, inverse = factorized_plate(a, b, nx, ny, nu)
+    values, vectors = eigsh(stiffness, k + RIGID_MODES, mass, sigma=SHIFT, OPinv=inverse)
+    order = np.argsort(values)[RIGID_MODES:]
+    frequencies = np.sqrt(np.maximum(values[order], 0))
+
+    modes = vectors[:, order].T.reshape(k, ny, nx)
+    peaks = np.take_along_axis(modes.reshape(k, -1), np.abs(modes.reshape(k, -1)).argmax(axis=1)[:, None], 1)
+    modes /= peaks[:, :, None]
+    modes.flags.writeable = False
+    frequencies.flags.writeable = False
+    return modes, frequencies
+
+# free_plate_modes() stored as a mode atlas, so each plate is only solved once
+# across sessions; atlas[i] is the i-th mode
+def free_plate_atlas(a, b, resolution, k, dtype=np.float32, build=True):
+    path = atlas_path(f"free{k}", a, b, resolution, dtype)
+    shape = (k, resolution, resolution)
+    atlas = open_atlas(path, shape, np.dtype(dtype))
+    if atlas is None and build:
+        def fill(atlas):
+            atlas[:] = free_plate_modes(a, b, resolution, resolution, k)[0]
+
+        atlas = build_atlas(path, shape, dtype, fill)
+    return atlas
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Solve the lowest bending modes of a free a x b plate.")
+    parser.add_argument("-a", type=float, default=1.0, help="plate width")
+    parser.add_argument("-b", type=float, default=1.0, help="plate height")
+    parser.add_argument("--grid", type=int, default=300, help="nodes along each side")
+    parser.add_argument("--modes", type=int, default=50)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    factorized_plate(args.a, args.b, args.grid, args.grid)
+    factored = time.perf_counter()
+    _, frequencies = free_plate_modes(args.a, args.b, args.grid, args.grid, args.modes)
+    solved = time.perf_counter()
+    print(f"{args.grid}x{args.grid} grid: factorized in {factored - start:.1f}s, "
+          f"{args.modes} modes in {solved - factored:.1f}s")
+    # omega * a^2 in units of sqrt(D / rho h); about 13.5, 19.6, 24.3, 34.8
+    # for the lowest modes of a free square plate with nu = 0.3 (Leissa)
+    print("omega a^2:", np.round(frequencies[:8] * args.a ** 2, 2))
@@ -0,0 +1,138 @@
+import argparse
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from modes import colormap_indices, colormap_lut, combined_rows
+
+# Poster-size Chladni fields (20000x20000 and up) rendered a band of rows at a
+# time. Pass 1 computes the field into a float32 .npy memory map on disk;
+# pass 2 colormaps and deflates each band. Both passes run in worker
+# processes, and the main process only stitches compressed bands into the
+# PNG, so peak memory depends on the band size, not the image size.
+
+# Rows per band
+TILE_ROWS = 256
+ADLER_BASE = 65521
+
+# Pass 1: compute rows start:stop into the memory-mapped field and return
+# their largest |value| for the symmetric color range
+def compute_tile(job):
+    field_path, modes, a, b, width, height, start, stop = job
+    field = np.load(field_path, mmap_mode="r+")
+    tile = combined_rows(modes, a, b, width, height, start, stop, np.float32)
+    field[start:stop] = tile
+    field.flush()
+    return float(np.abs(tile).max())
+
+# Pass 2: colormap rows start:stop and deflate them as PNG scanlines. The
+# bands are raw deflate streams ended with a sync flush, so they can be
+# concatenated into one zlib stream; the adler32 of each band's scanlines is
+# returned for combine_adler32().
+def encode_tile(job):
+    field_path, start, stop, limit, cmap, level = job
+    field = np.load(field_path, mmap_mode="r")
+    lut = colormap_lut(cmap)
+    rgb = lut[colormap_indices(field[start:stop], limit, len(lut))]
+
+    # Every scanline starts with filter type 0 (none)
+    scanlines = np.zeros((stop - start, 1 + rgb.shape[1] * 3), dtype=np.uint8)
+    scanlines[:, 1:] = rgb.reshape(stop - start, -1)
+    raw = scanlines.tobytes()
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    data = compressor.compress(raw) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    return data, zlib.adler32(raw), len(raw)
+
+# adler32 of two byte strings joined, from their separate checksums
+# (zlib's adler32_combine)
+def combine_adler32(adler1, adler2, length2):
+    remainder = length2 % ADLER_BASE
+    sum1 = adler1 & 0xffff
+    sum2 = remainder * sum1 % ADLER_BASE
+    sum1 = (sum1 + (adler2 & 0xffff) + ADLER_BASE - 1) % ADLER_BASE
+    sum2 = (sum2 + (adler1 >> 16) + (adler2 >> 16) + ADLER_BASE - remainder) % ADLER_BASE
+    return sum1 | (sum2 << 16)
+
+def png_chunk(kind, data):
+    return (struct.pack(">I", len(data)) + kind + data
+            + struct.pack(">I", zlib.crc32(kind + data)))
+
+# Writes an 8-bit RGB PNG from deflated bands, one IDAT chunk per band
+class PngStripWriter:
+    def __init__(self, path, width, height):
+        self.file = open(path, "wb")
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        self.file.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        self.file.write(png_chunk(b"IDAT", b"\x78\x9c"))  # zlib header
+        self.adler = 1
+
+    def write(self, data, adler, length):
+        self.file.write(png_chunk(b"IDAT", data))
+        self.adler = combine_adler32(self.adler, adler, length)
+
+    def close(self):
+        # Empty final deflate block, then the checksum of all scanlines
+        end = zlib.compressobj(9, zlib.DEFLATED, -15).flush()
+        self.file.write(png_chunk(b"IDAT", end + struct.pack(">I", self.adler)))
+        self.file.write(png_chunk(b"IEND", b""))
+        self.file.close()
+
+def render(output, modes, a, b, size, cmap, workers, tile_rows, field_path, level):
+    width, height = size
+    bands = [(start, min(start + tile_rows, height)) for start in range(0, height, tile_rows)]
+    field = np.lib.format.open_memmap(field_path, mode="w+", dtype=np.float32, shape=(height, width))
+    del field  # Workers open their own views
+
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = [(field_path, modes, a, b, width, height, start, stop) for start, stop in bands]
+        limit = max(executor.map(compute_tile, jobs)) or 1.0
+        print(f"Computed {width}x{height} field in {time.perf_counter() - start_time:.1f}s")
+
+        writer = PngStripWriter(output, width, height)
+        try:
+            jobs = [(field_path, start, stop, limit, cmap, level) for start, stop in bands]
+            for band in executor.map(encode_tile, jobs):
+                writer.write(*band)
+        finally:
+            writer.close()
+    print(f"Wrote {output} in {time.perf_counter() - start_time:.1f}s")
+
+# "2,3" -> (2, 3)
+def parse_mode(text):
+    m, _, n = text.partition(",")
+    return int(m), int(n)
+
+def parse_size(text):
+    width, _, height = text.partition("x")
+    return int(width), int(height)
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a poster-size Chladni pattern to PNG in bands.")
+    parser.add_argument("output", help="PNG file to write")
+    parser.add_argument("--size", type=parse_size, default=(20000, 20000), help="WIDTHxHEIGHT (default 20000x20000)")
+    parser.add_argument("--mode", type=parse_mode, action="append",
+                        help="M,N of a mode to add (repeatable, default 2,3)")
+    parser.add_argument("-a", type=float, default=1.0, help="plate width")
+    parser.add_argument("-b", type=float, default=1.0, help="plate height")
+    parser.add_argument("--cmap", default="RdBu")
+    parser.add_argument("--tile-rows", type=int, default=TILE_ROWS, help="rows per band")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--compression", type=int, default=6, help="zlib level 0-9")
+    parser.add_argument("--field", help="where to keep the float32 field (.npy); "
+                                        "by default a temporary file next to the output")
+    args = parser.parse_args()
+
+    field_path = args.field or args.output + ".field.npy"
+    try:
+        render(args.output, args.mode or [(2, 3)], args.a, args.b, args.size, args.cmap,
+               args.workers, args.tile_rows, field_path, args.compression)
+    finally:
+        if not args.field and os.path.exists(field_path):
+            os.remove(field_path)
+
+
+if __name__ == "__main__":
+    main()
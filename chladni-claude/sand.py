@@ -0,0 +1,166 @@
+import argparse
+import time
+import numpy as np
+from modes import combined_pattern
+
+# Sand on a vibrating plate, after thelig.ht/chladni: grains are shaken where
+# the plate moves and come to rest on the nodal lines, where it does not.
+# Positions are float32 grid coordinates (column, row) of the field, so a
+# height x width field maps straight onto the density image.
+
+# Largest jump, in grid cells, of a grain at the strongest antinode
+STEP_SIZE = 2.0
+# Grain counts timed by --benchmark
+BENCHMARK_COUNTS = [100_000, 300_000, 1_000_000, 3_000_000]
+
+class Sand:
+    def __init__(self, count, width, height, seed=None):
+        self.width, self.height = width, height
+        self.rng = np.random.default_rng(seed)
+        self.x = self.rng.random(count, dtype=np.float32) * np.float32(width - 1)
+        self.y = self.rng.random(count, dtype=np.float32) * np.float32(height - 1)
+        self.field = np.zeros(width * height, dtype=np.float32)
+
+        # Scratch arrays reused by every step, so stepping allocates nothing
+        self.fx, self.fy, self.top, self.bottom, self.scratch = (
+            np.empty(count, dtype=np.float32) for _ in range(5)
+        )
+        self.column = np.empty(count, dtype=np.intp)
+        self.index = np.empty(count, dtype=np.intp)
+
+    # Field to shake the grains with; only |field| relative to its largest
+    # value matters
+    def set_field(self, field):
+        field = np.abs(field).astype(np.float32).ravel()
+        peak = field.max()
+        if peak > 0:
+            field /= peak
+        self.field = field
+
+    # Flat index of each grain's cell into self.index, keeping the cell one
+    # row and column inside the grid, and the fractions across it
+    def locate(self):
+        for position, limit, cell, fraction in ((self.x, self.width - 2, self.column, self.fx),
+                                                (self.y, self.height - 2, self.index, self.fy)):
+            np.floor(position, out=fraction)
+            np.minimum(fraction, limit, out=fraction)
+            cell[:] = fraction
+            np.subtract(position, fraction, out=fraction)
+        self.index *= self.width
+        self.index += self.column
+
+    # Bilinear interpolation of the field at every grain
+    def sample(self):
+        self.locate()
+        index, top, bottom, scratch = self.index, self.top, self.bottom, self.scratch
+        field = self.field
+
+        # Top and bottom edges of the cell, each f0 + fx * (f1 - f0). The
+        # indices are always in range; mode="clip" just stops take() from
+        # buffering its output.
+        for edge in (top, bottom):
+            np.take(field, index, out=edge, mode="clip")
+            index += 1
+            np.take(field, index, out=scratch, mode="clip")
+            scratch -= edge
+            scratch *= self.fx
+            edge += scratch
+            index += self.width - 1
+
+        # Blend the edges by fy
+        bottom -= top
+        bottom *= self.fy
+        top += bottom
+        return top
+
+    # One random-walk step: every grain moves by a normal step scaled by the
+    # plate's amplitude where it stands
+    def step(self):
+        amplitude = self.sample()
+        amplitude *= STEP_SIZE
+        noise = self.scratch
+        for position, limit in ((self.x, self.width - 1), (self.y, self.height - 1)):
+            self.rng.standard_normal(dtype=np.float32, out=noise)
+            noise *= amplitude
+            position += noise
+            np.clip(position, 0, limit, out=position)
+
+    # Grains per pixel as a height x width image
+    def density(self):
+        for position, cell in ((self.x, self.column), (self.y, self.index)):
+            np.rint(position, out=self.scratch)
+            cell[:] = self.scratch
+        self.index *= self.width
+        self.index += self.column
+        counts = np.bincount(self.index, minlength=self.width * self.height)
+        return counts.reshape(self.height, self.width)
+
+# Milliseconds per step for each grain count, to size installations
+def benchmark(modes, a, b, resolution, counts, steps):
+    field = combined_pattern(modes, a, b, resolution, resolution)
+    print(f"{resolution}x{resolution} field, {steps} steps per count")
+    for count in counts:
+        sand = Sand(count, resolution, resolution, seed=0)
+        sand.set_field(field)
+        sand.step()  # Warm up
+        start = time.perf_counter()
+        for _ in range(steps):
+            sand.step()
+        step_time = (time.perf_counter() - start) / steps
+        start = time.perf_counter()
+        sand.density()
+        density_time = time.perf_counter() - start
+        print(f"{count:>10,} grains: {step_time * 1000:7.2f} ms/step "
+              f"({count / step_time / 1e6:5.1f} M grains/s), density {density_time * 1000:.2f} ms")
+
+def animate(modes, a, b, resolution, count, steps_per_frame):
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
+    sand = Sand(count, resolution, resolution)
+    sand.set_field(combined_pattern(modes, a, b, resolution, resolution))
+
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.set_axis_off()
+    # Fixed color range so frames stay comparable as the sand gathers
+    limit = 4 * count / resolution ** 2
+    im = ax.imshow(sand.density(), cmap='gray_r', vmin=0, vmax=limit,
+                   interpolation='nearest', animated=True)
+
+    def frame(_):
+        for _ in range(steps_per_frame):
+            sand.step()
+        im.set_array(sand.density())
+        return im,
+
+    animation = FuncAnimation(fig, frame, interval=1, blit=True, cache_frame_data=False)
+    plt.show()
+    return animation
+
+# "2,3" -> (2, 3)
+def parse_mode(text):
+    m, _, n = text.partition(",")
+    return int(m), int(n)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sand grains gathering on the nodal lines of a Chladni plate.")
+    parser.add_argument("--mode", type=parse_mode, action="append",
+                        help="M,N of a mode to add (repeatable, default 2,3)")
+    parser.add_argument("-a", type=float, default=1.0, help="plate width")
+    parser.add_argument("-b", type=float, default=1.0, help="plate height")
+    parser.add_argument("--resolution", type=int, default=500)
+    parser.add_argument("--grains", type=int, default=500_000)
+    parser.add_argument("--steps-per-frame", type=int, default=1)
+    parser.add_argument("--benchmark", action="store_true", help="time one step for several grain counts")
+    parser.add_argument("--steps", type=int, default=20, help="steps timed per count with --benchmark")
+    args = parser.parse_args()
+    modes = args.mode or [(2, 3)]
+
+    if args.benchmark:
+        benchmark(modes, args.a, args.b, args.resolution, BENCHMARK_COUNTS, args.steps)
+    else:
+        animate(modes, args.a, args.b, args.resolution, args.grains, args.steps_per_frame)
+
+
+if __name__ == "__main__":
+    main()
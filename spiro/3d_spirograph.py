@@ -1,6 +1,9 @@
+import sys
 import pygame
 import pygame_gui
-import math
+from app_loop import run
+from scenes import draw_depth_curve, spirograph_3d_passes
+from worker import SWITCH_INTERVAL, CurveWorker
 
 # Initialize Pygame
 pygame.init()
@@ -10,6 +13,12 @@ WIDTH, HEIGHT = 800, 600
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Interactive 3D Spirograph")
 
+# Max distance in pixels between the curve and the drawn lines;
+# larger values draw fewer vertices
+TOLERANCE = 0.25
+# How far the farthest parts of the curve fade into the background, 0 to 1
+FOG = 0.5
+
 # Set up the UI manager
 manager = pygame_gui.UIManager((WIDTH, HEIGHT))
 
@@ -57,77 +66,37 @@ pygame_gui.elements.UILabel(
     manager=manager
 )
 
-def rotate_point(x, y, z, angle_x, angle_y):
-    # Rotate around X axis
-    new_y = y * math.cos(angle_x) - z * math.sin(angle_x)
-    new_z = y * math.sin(angle_x) + z * math.cos(angle_x)
-    y, z = new_y, new_z
-
-    # Rotate around Y axis
-    new_x = x * math.cos(angle_y) + z * math.sin(angle_y)
-    new_z = -x * math.sin(angle_y) + z * math.cos(angle_y)
-    x, z = new_x, new_z
+# Projected points and depths of the spirograph, coarse to fine
+def spirograph_3d_curve(R, r, d, tilt_angle, preview=None, chunk=None):
+    return spirograph_3d_passes((WIDTH, HEIGHT), R, r, d, tilt_angle, tolerance=TOLERANCE,
+                                preview=preview, chunk=chunk)
 
-    return x, y, z
+# Near parts of the curve hide the parts behind them
+def render_depth_curve(surface, curve):
+    points, depths = curve
+    draw_depth_curve(surface, points, depths(), fog=FOG)
 
-def project_point(x, y, z):
-    # Simple perspective projection
-    factor = 200 / (z + 200)
-    x_proj = x * factor
-    y_proj = y * factor
-    return x_proj, y_proj
+# Curves are sampled and drawn on a background thread, so the sliders stay
+# responsive; a coarse preview comes first and is refined as it goes. The
+# GIL is handed between the threads more often than the default.
+sys.setswitchinterval(SWITCH_INTERVAL)
+worker = CurveWorker(spirograph_3d_curve, render_depth_curve, (WIDTH, HEIGHT))
 
+# Returns True until the spirograph is complete
 def draw_3d_spirograph(R, r, d, tilt_angle):
-    points = []
-    t = 0
-    while t < 200 * math.pi:  # Adjust for more or fewer rotations
-        x = (R - r) * math.cos(t) + d * math.cos((R - r) * t / r)
-        y = (R - r) * math.sin(t) - d * math.sin((R - r) * t / r)
-        z = 0
-
-        # Apply 3D rotation
-        angle_x = math.radians(tilt_angle)
-        angle_y = t * 0.01  # This creates the rotation around the Y-axis as the spirograph is drawn
-        x, y, z = rotate_point(x, y, z, angle_x, angle_y)
-
-        # Project 3D point to 2D
-        x_proj, y_proj = project_point(x, y, z)
-        
-        points.append((x_proj + WIDTH // 2, y_proj + HEIGHT // 2))
-        t += 0.01
-    
-    if len(points) > 1:
-        pygame.draw.lines(screen, (255, 255, 255), False, points, 1)
-
-# Main game loop
-clock = pygame.time.Clock()
-is_running = True
-
-while is_running:
-    time_delta = clock.tick(60) / 1000.0
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            is_running = False
-
-        manager.process_events(event)
-
-    manager.update(time_delta)
-
-    # Clear the screen
-    screen.fill((0, 0, 0))
-
-    # Get current parameter values
-    R = R_slider.get_current_value()
-    r = r_slider.get_current_value()
-    d = d_slider.get_current_value()
-    tilt_angle = angle_slider.get_current_value()
-
-    # Draw the 3D spirograph
-    draw_3d_spirograph(R, r, d, tilt_angle)
-
-    manager.draw_ui(screen)
-
-    pygame.display.update()
-
-pygame.quit()
\ No newline at end of file
+    return worker.draw(screen, (R, r, d, tilt_angle))
+
+# Current parameter values
+def slider_values():
+    return (
+        R_slider.get_current_value(),
+        r_slider.get_current_value(),
+        d_slider.get_current_value(),
+        angle_slider.get_current_value(),
+    )
+
+# Main game loop; the scene is redrawn only when a slider moves
+run(screen, manager, slider_values, draw_3d_spirograph)
+
+worker.close()
+pygame.quit()
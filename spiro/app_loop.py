@@ -0,0 +1,75 @@
+import os
+import pygame
+import profiling
+
+# Frame rate while the scene is animated or the UI is in use
+FPS = 60
+# Keep running frames this long after the last event, so pygame_gui can
+# finish slider drags and hover effects before the loop goes back to sleep
+ACTIVE_MS = 500
+# Key that shows or hides the per-stage timing overlay; SPIRO_PROFILE=1 in the
+# environment shows it from the start
+OVERLAY_KEY = pygame.K_F3
+
+# Main loop shared by the spirograph scripts. `params()` returns the current
+# slider values and `draw(*params)` draws the scene for them onto `screen`;
+# a progressive scene returns True from draw() while it has more to draw.
+#
+# The scene is only redrawn when the values change, while it reports more to
+# draw, or every frame if `animated`; in between, a copy of it is put back
+# under the UI. With no events for ACTIVE_MS and nothing to draw, the loop
+# sleeps in pygame.event.wait() and uses no CPU until the next event.
+# `handle_event`, if given, sees every event before the UI does.
+def run(screen, manager, params, draw, animated=False, fps=FPS, handle_event=None):
+    clock = pygame.time.Clock()
+    scene = screen.copy()
+    drawn = None  # Values the scene was last drawn with
+    pending = False  # The scene has more to draw for the same values
+    active_until = 0
+    if os.environ.get("SPIRO_PROFILE"):
+        profiling.enable()
+
+    while True:
+        if animated or pending or pygame.time.get_ticks() < active_until:
+            events = pygame.event.get()
+        else:
+            events = [pygame.event.wait()] + pygame.event.get()
+            clock.tick()  # Don't hand the idle time to the UI as one long frame
+
+        for event in events:
+            if event.type == pygame.QUIT:
+                return
+            if event.type == pygame.KEYDOWN and event.key == OVERLAY_KEY:
+                if profiling.active_profiler():
+                    profiling.disable()
+                else:
+                    profiling.enable()
+                drawn = None  # Time a fresh frame straight away
+            if handle_event:
+                handle_event(event)
+            manager.process_events(event)
+        # A held mouse button can keep moving a slider without new events
+        if events or any(pygame.mouse.get_pressed()):
+            active_until = pygame.time.get_ticks() + ACTIVE_MS
+
+        time_delta = clock.tick(fps) / 1000.0
+        manager.update(time_delta)
+
+        values = params()
+        if animated or pending or values != drawn:
+            with profiling.stage("scene"):
+                screen.fill((0, 0, 0))
+                pending = draw(*values)
+                scene.blit(screen, (0, 0))
+            drawn = values
+        else:
+            screen.blit(scene, (0, 0))
+
+        with profiling.stage("ui"):
+            manager.draw_ui(screen)
+        profiler = profiling.active_profiler()
+        if profiler:
+            profiling.draw_overlay(screen, profiler)
+        with profiling.stage("display"):
+            pygame.display.update()
+        profiling.end_frame()
@@ -0,0 +1,58 @@
+import numpy as np
+
+# The two coordinates a rotation about each axis mixes, in right-handed order
+_ROTATION_PLANES = {"x": (1, 2), "y": (2, 0), "z": (0, 1)}
+
+# 4x4 homogeneous rotation by theta radians about "x", "y" or "z"
+def rotation(axis, theta):
+    i, j = _ROTATION_PLANES[axis]
+    c, s = np.cos(theta), np.sin(theta)
+    matrix = np.eye(4)
+    matrix[i, i], matrix[i, j] = c, -s
+    matrix[j, i], matrix[j, j] = s, c
+    return matrix
+
+def rotation_x(theta):
+    return rotation("x", theta)
+
+def rotation_y(theta):
+    return rotation("y", theta)
+
+def rotation_z(theta):
+    return rotation("z", theta)
+
+# Perspective projection onto the screen:
+#   screen = scale * (x, y) / (1 + z / focal) + center
+# The divisor ends up in w, so project() finishes it with the perspective divide
+def perspective(focal, scale=1.0, center=(0.0, 0.0)):
+    cx, cy = center
+    return np.array([
+        [scale, 0.0, cx / focal, cx],
+        [0.0, scale, cy / focal, cy],
+        [0.0, 0.0, 1.0, 0.0],
+        [0.0, 0.0, 1.0 / focal, 1.0],
+    ])
+
+# Apply a 4x4 matrix to an (N, 3) array of points, without the divide
+def transform(points, matrix):
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+# Rotate every point by its own angle about "x", "y" or "z"
+def twist(points, angles, axis):
+    i, j = _ROTATION_PLANES[axis]
+    c, s = np.cos(angles), np.sin(angles)
+    twisted = points.copy()
+    twisted[:, i] = points[:, i] * c - points[:, j] * s
+    twisted[:, j] = points[:, i] * s + points[:, j] * c
+    return twisted
+
+# Apply a model-view-projection matrix to an (N, 3) array of points,
+# including the perspective divide, giving (N, 2) screen coordinates
+def project(points, matrix):
+    clip = points @ matrix[:, :3].T + matrix[:, 3]
+    return clip[:, :2] / clip[:, 3:]
+
+# The w each point ends up with under a perspective matrix: 1 + z / focal,
+# growing with distance from the camera and <= 0 behind it. Used as depth.
+def depth(points, matrix):
+    return points @ matrix[3, :3] + matrix[3, 3]
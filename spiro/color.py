@@ -0,0 +1,40 @@
+import numpy as np
+
+# Vectorized colorsys.hsv_to_rgb: h, s, v are arrays in [0, 1], the result is
+# an (N, 3) float array in [0, 1] with the same values colorsys returns
+def hsv_to_rgb(h, s, v):
+    h, s, v = np.broadcast_arrays(*(np.asarray(c, dtype=float) for c in (h, s, v)))
+    i = np.floor(h * 6.0)
+    f = h * 6.0 - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i.astype(int) % 6
+
+    # Component order for each of the six hue sectors
+    sectors = np.stack([
+        np.stack([v, t, p], axis=-1),
+        np.stack([q, v, p], axis=-1),
+        np.stack([p, v, t], axis=-1),
+        np.stack([p, q, v], axis=-1),
+        np.stack([t, p, v], axis=-1),
+        np.stack([v, p, q], axis=-1),
+    ])
+    rgb = np.take_along_axis(sectors, i[None, ..., None], axis=0)[0]
+
+    # colorsys returns pure grey when there is no saturation
+    grey = s == 0.0
+    rgb[grey] = v[grey, None]
+    return rgb
+
+
+if __name__ == "__main__":
+    import colorsys
+
+    rng = np.random.default_rng(0)
+    h, s, v = rng.random((3, 10000))
+    s[:100] = 0.0
+    h[100:200] = np.linspace(0, 1, 100, endpoint=False)
+    expected = np.array([colorsys.hsv_to_rgb(*hsv) for hsv in zip(h, s, v)])
+    assert np.allclose(hsv_to_rgb(h, s, v), expected)
+    print("color: hsv_to_rgb matches colorsys")
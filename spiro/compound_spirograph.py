@@ -1,6 +1,11 @@
+import sys
 import pygame
 import pygame_gui
-import math
+from app_loop import run
+from curve_cache import CurveCache
+from gallery import Gallery, parameter_grid
+from scenes import compound_spirograph_passes, draw_curve
+from worker import SWITCH_INTERVAL, CurveWorker
 
 # Initialize Pygame
 pygame.init()
@@ -10,6 +15,10 @@ WIDTH, HEIGHT = 800, 600
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Interactive Compound Spirograph")
 
+# Max distance in pixels between the curve and the drawn lines;
+# larger values draw fewer vertices
+TOLERANCE = 0.25
+
 # Set up the UI manager
 manager = pygame_gui.UIManager((WIDTH, HEIGHT))
 
@@ -56,55 +65,94 @@ pygame_gui.elements.UILabel(
     text="d (Pen distance)",
     manager=manager
 )
-
-# Function to draw the compound spirograph
+gallery_button = pygame_gui.elements.UIButton(
+    relative_rect=pygame.Rect((10, 130), (100, 24)),
+    text="Gallery (G)",
+    manager=manager
+)
+# Everything above, hidden while the gallery is shown
+controls = list(manager.get_root_container().elements)
+
+# Thumbnails of the slider combinations in steps across their ranges; a
+# click on one loads its values into the sliders
+gallery = Gallery(
+    parameter_grid(range(100, 351, 25), range(50, 201, 25), range(10, 101, 10), range(5, 101, 15)),
+    (WIDTH, HEIGHT)
+)
+gallery_shown = False
+
+def show_gallery(shown):
+    global gallery_shown
+    gallery_shown = shown
+    for element in controls:
+        if shown:
+            element.hide()
+        else:
+            element.show()
+
+def handle_event(event):
+    if event.type == pygame_gui.UI_BUTTON_PRESSED and event.ui_element == gallery_button:
+        show_gallery(True)
+    elif event.type == pygame.KEYDOWN and event.key == pygame.K_g:
+        show_gallery(not gallery_shown)
+    elif not gallery_shown:
+        return
+    elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+        show_gallery(False)
+    elif event.type == pygame.KEYDOWN and event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+        gallery.scroll_by(gallery.rows if event.key == pygame.K_PAGEDOWN else -gallery.rows)
+    elif event.type == pygame.MOUSEWHEEL:
+        gallery.scroll_by(-event.y)
+    elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+        index = gallery.index_at(event.pos)
+        if index is not None:
+            for slider, value in zip([R1_slider, R2_slider, r_slider, d_slider], gallery.params[index].tolist()):
+                slider.set_current_value(value)
+            show_gallery(False)
+
+# Points of the compound spirograph, centred on the screen, coarse to fine
+def compound_spirograph_curve(R1, R2, r, d, preview=None, chunk=None):
+    return compound_spirograph_passes((WIDTH, HEIGHT), R1, R2, r, d, tolerance=TOLERANCE,
+                                      preview=preview, chunk=chunk)
+
+# Finished curves and their rendered surfaces, keyed on the slider values
+curve_cache = CurveCache((WIDTH, HEIGHT))
+# Curves are sampled and drawn on a background thread, so the sliders stay
+# responsive; a coarse preview comes first and is refined as it goes. The
+# GIL is handed between the threads more often than the default.
+sys.setswitchinterval(SWITCH_INTERVAL)
+worker = CurveWorker(compound_spirograph_curve, draw_curve, (WIDTH, HEIGHT), curve_cache)
+
+# Function to draw the compound spirograph; returns True until it is complete
 def draw_compound_spirograph(R1, R2, r, d):
-    points = []
-    t = 0
-    while t < 200 * math.pi:  # Adjust for more or fewer rotations
-        # Position of the center of the middle circle
-        x1 = (R1 - R2) * math.cos(t)
-        y1 = (R1 - R2) * math.sin(t)
-        
-        # Position of the pen point
-        x = x1 + (R2 - r) * math.cos((R1 - R2) * t / R2) + d * math.cos(((R1 - R2) * t / R2) + ((R2 - r) * t / r))
-        y = y1 + (R2 - r) * math.sin((R1 - R2) * t / R2) - d * math.sin(((R1 - R2) * t / R2) + ((R2 - r) * t / r))
-        
-        points.append((x + WIDTH // 2, y + HEIGHT // 2))
-        t += 0.01
-    
-    if len(points) > 1:
-        pygame.draw.lines(screen, (255, 255, 255), False, points, 1)
-
-# Main game loop
-clock = pygame.time.Clock()
-is_running = True
-
-while is_running:
-    time_delta = clock.tick(60) / 1000.0
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            is_running = False
-
-        manager.process_events(event)
-
-    manager.update(time_delta)
-
-    # Clear the screen
-    screen.fill((0, 0, 0))
-
-    # Get current parameter values
-    R1 = R1_slider.get_current_value()
-    R2 = R2_slider.get_current_value()
-    r = r_slider.get_current_value()
-    d = d_slider.get_current_value()
-
-    # Draw the compound spirograph
-    draw_compound_spirograph(R1, R2, r, d)
-
-    manager.draw_ui(screen)
-
-    pygame.display.update()
-
-pygame.quit()
\ No newline at end of file
+    # The curve surfaces are opaque, so blitting one also clears the screen
+    return worker.draw(screen, (R1, R2, r, d))
+
+# Current parameter values
+def slider_values():
+    return (
+        R1_slider.get_current_value(),
+        R2_slider.get_current_value(),
+        r_slider.get_current_value(),
+        d_slider.get_current_value(),
+    )
+
+# What is on screen: the gallery's scroll position and hovered thumbnail, or
+# the curve for the sliders
+def scene_values():
+    if gallery_shown:
+        return ("gallery", gallery.scroll, gallery.index_at(pygame.mouse.get_pos()))
+    return slider_values()
+
+def draw_scene(*values):
+    if values[0] == "gallery":
+        gallery.draw(screen, values[2])
+        return False
+    return draw_compound_spirograph(*values)
+
+# Main game loop; the scene is redrawn only when a slider moves or the
+# gallery changes
+run(screen, manager, scene_values, draw_scene, handle_event=handle_event)
+
+worker.close()
+pygame.quit()
@@ -0,0 +1,40 @@
+from collections import OrderedDict, namedtuple
+import pygame
+
+CachedCurve = namedtuple("CachedCurve", ["points", "surface"])
+
+# Bounded LRU of finished curves keyed on the slider values, filled by
+# whoever draws them (see progressive.ProgressiveCurve). Each entry keeps the
+# point array and the curve already rasterized onto an opaque offscreen
+# surface from new_surface(), so a cache hit costs a single blit.
+class CurveCache:
+    def __init__(self, size, max_entries=32, background=(0, 0, 0)):
+        self.size = size
+        self.max_entries = max_entries
+        self.background = background
+        self.entries = OrderedDict()
+
+    # The entry for `key`, or None
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    # Add a curve rendered elsewhere onto a surface from new_surface()
+    def store(self, key, points, surface):
+        entry = CachedCurve(points, surface)
+        self.entries[key] = entry
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+    def new_surface(self):
+        surface = pygame.Surface(self.size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()  # Match the display format for fast blits
+        surface.fill(self.background)
+        return surface
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,144 @@
+import math
+from fractions import Fraction
+import numpy as np
+
+# Default sweep used by the original drawing loops
+T_MAX = 200 * math.pi
+DT = 0.01
+
+# Cap on the period, in full turns of t, for ratios that do not close early
+MAX_TURNS = 100
+# Slider values are rationalized with at most this denominator
+MAX_DENOMINATOR = 1000
+
+def _rational(value):
+    return Fraction(value).limit_denominator(MAX_DENOMINATOR)
+
+# Smallest whole number of turns after which every frequency (in cycles per
+# turn of t) has completed a whole number of cycles, capped at max_turns
+def _turns(frequencies, max_turns):
+    turns = 1
+    for frequency in frequencies:
+        turns = math.lcm(turns, frequency.denominator)
+        if turns >= max_turns:
+            return max_turns
+    return turns
+
+# The hypotrochoid mixes frequencies 1 and (R - r) / r
+def hypotrochoid_period(R, r, max_turns=MAX_TURNS):
+    R, r = _rational(R), _rational(r)
+    return 2 * math.pi * _turns([(R - r) / r], max_turns)
+
+# The compound curve mixes 1, (R1 - R2) / R2 and (R1 - R2) / R2 + (R2 - r) / r
+def compound_period(R1, R2, r, max_turns=MAX_TURNS):
+    R1, R2, r = _rational(R1), _rational(R2), _rational(r)
+    middle = (R1 - R2) / R2
+    pen = middle + (R2 - r) / r
+    return 2 * math.pi * _turns([middle, pen], max_turns)
+
+# Hypotrochoid traced by a pen at distance d inside a circle r rolling in R
+def hypotrochoid(R, r, d, t):
+    t = np.asarray(t, dtype=float)
+    k = (R - r) / r
+    points = np.empty((t.size, 2))
+    points[:, 0] = (R - r) * np.cos(t) + d * np.cos(k * t)
+    points[:, 1] = (R - r) * np.sin(t) - d * np.sin(k * t)
+    return points
+
+# Compound spirograph: circle r rolls in R2, which itself rolls in R1.
+# The parameters broadcast against t, so parameter arrays of shape (batch, 1)
+# and t of shape (batch, samples) give a batch of curves at once, as
+# points of shape (batch, samples, 2).
+def compound(R1, R2, r, d, t):
+    t = np.asarray(t, dtype=float)
+    # Phase of the middle circle and of the pen arm
+    phase_middle = (R1 - R2) * t / R2
+    phase_pen = phase_middle + (R2 - r) * t / r
+    points = np.empty(np.broadcast_shapes(phase_pen.shape, np.shape(d)) + (2,))
+    points[..., 0] = (R1 - R2) * np.cos(t) + (R2 - r) * np.cos(phase_middle) + d * np.cos(phase_pen)
+    points[..., 1] = (R1 - R2) * np.sin(t) + (R2 - r) * np.sin(phase_middle) - d * np.sin(phase_pen)
+    return points
+
+# The curves as sums of rotating vectors: x + iy is the sum of
+# a * exp(i * w * t) over the (a, w) pairs returned, which lets long runs
+# of t be evaluated with complex multiplies instead of trig calls
+def hypotrochoid_terms(R, r, d):
+    return [(R - r, 1.0), (d, -(R - r) / r)]
+
+def compound_terms(R1, R2, r, d):
+    middle = (R1 - R2) / R2
+    return [(R1 - R2, 1.0), (R2 - r, middle), (d, -(middle + (R2 - r) / r))]
+
+
+if __name__ == "__main__":
+    # Check the vectorized formulas against the original per-point loops
+    def hypotrochoid_loop(R, r, d):
+        points = []
+        t = 0
+        while t < 200 * math.pi:
+            x = (R - r) * math.cos(t) + d * math.cos((R - r) * t / r)
+            y = (R - r) * math.sin(t) - d * math.sin((R - r) * t / r)
+            points.append((x, y))
+            t += 0.01
+        return np.array(points)
+
+    def compound_loop(R1, R2, r, d):
+        points = []
+        t = 0
+        while t < 200 * math.pi:
+            x1 = (R1 - R2) * math.cos(t)
+            y1 = (R1 - R2) * math.sin(t)
+            x = x1 + (R2 - r) * math.cos((R1 - R2) * t / R2) + d * math.cos(((R1 - R2) * t / R2) + ((R2 - r) * t / r))
+            y = y1 + (R2 - r) * math.sin((R1 - R2) * t / R2) - d * math.sin(((R1 - R2) * t / R2) + ((R2 - r) * t / r))
+            points.append((x, y))
+            t += 0.01
+        return np.array(points)
+
+    # Same t values the `while t < 200 * math.pi: t += 0.01` loops visit
+    t = np.arange(0, T_MAX, DT)
+    for R, r, d in [(200, 50, 80), (300, 10, 100), (50, 37, 10)]:
+        expected = hypotrochoid_loop(R, r, d)
+        assert expected.shape == (t.size, 2)
+        assert np.allclose(hypotrochoid(R, r, d, t), expected, atol=1e-6)
+    for R1, R2, r, d in [(250, 150, 50, 30), (350, 50, 10, 100), (100, 200, 73, 5)]:
+        expected = compound_loop(R1, R2, r, d)
+        assert expected.shape == (t.size, 2)
+        assert np.allclose(compound(R1, R2, r, d, t), expected, atol=1e-6)
+    print("curves: vectorized formulas match the reference loops")
+
+    # One full period including its endpoint, so the curve closes exactly
+    def sample_period(period, dt=DT):
+        steps = max(1, math.ceil(period / dt))
+        return np.linspace(0, period, steps + 1)
+
+    # A sampled period must bring the pen back to its starting point
+    for R, r, d in [(200, 50, 80), (300, 70, 40), (51, 10, 10)]:
+        points = hypotrochoid(R, r, d, sample_period(hypotrochoid_period(R, r)))
+        assert np.allclose(points[0], points[-1])
+    for R1, R2, r, d in [(250, 150, 50, 30), (300, 120, 45, 60)]:
+        points = compound(R1, R2, r, d, sample_period(compound_period(R1, R2, r)))
+        assert np.allclose(points[0], points[-1])
+    assert hypotrochoid_period(200, 50) == 2 * math.pi
+    assert compound_period(250, 150, 50) == 6 * math.pi
+    assert hypotrochoid_period(math.pi * 100, 7, max_turns=40) == 80 * math.pi
+    print("curves: periods close the curves")
+
+    # Points of a sum of rotating vectors at t
+    def terms_points(terms, t):
+        z = sum(a * np.exp(1j * w * t) for a, w in terms)
+        return np.column_stack((z.real, z.imag))
+
+    for R, r, d in [(200, 50, 80), (50, 37, 10)]:
+        assert np.allclose(terms_points(hypotrochoid_terms(R, r, d), t), hypotrochoid(R, r, d, t))
+    for R1, R2, r, d in [(250, 150, 50, 30), (100, 200, 73, 5)]:
+        assert np.allclose(terms_points(compound_terms(R1, R2, r, d), t), compound(R1, R2, r, d, t))
+    print("curves: rotating vector terms match the formulas")
+
+    # A batch of curves evaluated at once matches the curves one by one
+    batch = np.array([(250, 150, 50, 30), (100, 200, 73, 5)], dtype=float)
+    periods = np.array([compound_period(*params[:3]) for params in batch])
+    t = np.linspace(0, 1, 500) * periods[:, None]
+    points = compound(*(batch.T[:, :, None]), t)
+    for params, curve_t, curve in zip(batch, t, points):
+        assert np.allclose(curve, compound(*params, curve_t))
+    print("curves: batched compound curves match single ones")
@@ -0,0 +1,223 @@
+import argparse
+import io
+import json
+import math
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from scenes import BASE_SIZE, draw_wireframe, wireframe_points
+
+# Rendered frames waiting for the writer; bounds memory for any clip length
+QUEUE_SIZE = 16
+# Written next to a PNG sequence's frames: the settings they were rendered with
+SETTINGS_FILE = "settings.json"
+
+class SettingsMismatch(Exception):
+    pass
+
+def frame_path(directory, index):
+    return os.path.join(directory, f"frame_{index:06d}.png")
+
+# Number of frames already written by an earlier, interrupted export
+def written_frames(directory):
+    count = 0
+    while os.path.exists(frame_path(directory, count)):
+        count += 1
+    return count
+
+# Runs in the worker processes, which also do the expensive encoding so the
+# writer thread only has to put bytes on disk. The interactive script turns
+# the model by get_ticks() * 0.001, i.e. one radian per second, so frame i of
+# a clip at `fps` frames per second shows the angle i / fps.
+def render_frame(job):
+    index, fps, size, params, encoding = job
+    scale = min(size[0] / BASE_SIZE[0], size[1] / BASE_SIZE[1])
+    surface = pygame.Surface(size)
+    surface.fill((0, 0, 0))
+    points, depths = wireframe_points(size, *params, angle=index / fps, scale=scale)
+    draw_wireframe(surface, points, depths)
+
+    if encoding == "gif":
+        return index, quantize_for_gif(pygame.image.tobytes(surface, "RGB"), size)
+    data = io.BytesIO()
+    pygame.image.save(surface, data, "frame.png")
+    return index, data.getvalue()
+
+class PngSequenceWriter:
+    encoding = "png"
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, index, data):
+        path = frame_path(self.directory, index)
+        partial = path + ".partial"
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, path)  # A frame on disk is always complete
+
+    def close(self):
+        pass
+
+# Fixed GIF palette: a 6x6x6 color cube plus greys
+_LEVELS = [0, 51, 102, 153, 204, 255]
+GIF_PALETTE = [c for r in _LEVELS for g in _LEVELS for b in _LEVELS for c in (r, g, b)]
+GIF_PALETTE += [v for i in range(40) for v in (i * 255 // 39,) * 3]
+
+# RGB bytes -> GIF_PALETTE indices, done in the workers. Needs Pillow.
+def quantize_for_gif(data, size):
+    from PIL import Image
+
+    palette = Image.new("P", (1, 1))
+    palette.putpalette(GIF_PALETTE)
+    frame = Image.frombytes("RGB", size, data)
+    return frame.quantize(palette=palette, dither=Image.Dither.NONE).tobytes()
+
+# Appends frames to an animated GIF as they arrive instead of collecting them
+# first. Every frame uses GIF_PALETTE, so the file needs a single global color
+# table. Needs Pillow.
+class GifWriter:
+    encoding = "gif"
+
+    def __init__(self, path, size, fps):
+        from PIL import GifImagePlugin, Image
+
+        self.gif = GifImagePlugin
+        self.image = Image
+        self.size = size
+        self.duration = round(1000 / fps)
+        self.file = open(path, "wb")
+        self.started = False
+
+    def write(self, index, data):
+        frame = self.image.frombytes("P", self.size, data)
+        frame.putpalette(GIF_PALETTE)
+        if not self.started:
+            header, _ = self.gif.getheader(frame, None, {"loop": 0})
+            self.file.write(b"".join(header))
+            self.started = True
+        for chunk in self.gif.getdata(frame, duration=self.duration, loop=0):
+            self.file.write(chunk)
+
+    def close(self):
+        self.file.write(b";")  # GIF trailer
+        self.file.close()
+
+# Writes frames from the queue in order until it receives None
+def writer_loop(writer, frames, errors):
+    try:
+        while True:
+            item = frames.get()
+            if item is None:
+                break
+            writer.write(*item)
+    except Exception as error:
+        errors.append(error)
+        # Keep draining so the producer never blocks on a full queue
+        while frames.get() is not None:
+            pass
+
+# Index of the first frame still to render into `directory`. Frames left
+# by an earlier export are only reused if it had the same `settings`;
+# otherwise raises SettingsMismatch.
+def resume_point(directory, settings):
+    path = os.path.join(directory, SETTINGS_FILE)
+    first = written_frames(directory)
+    if first:
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            saved = None
+        if saved != settings:
+            raise SettingsMismatch(f"{directory} holds frames rendered with other settings ({saved}, now "
+                                   f"{settings}); remove them or export to another directory")
+    else:
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(settings, f)
+    return first
+
+def export(output, frame_count, fps, size, params, workers):
+    if output.lower().endswith(".gif"):
+        writer = GifWriter(output, size, fps)
+        first = 0
+    else:
+        settings = {"size": list(size), "fps": fps, "params": list(params)}
+        first = resume_point(output, settings)
+        writer = PngSequenceWriter(output)
+        if first:
+            print(f"Resuming after {first} frames already in {output}")
+
+    frames = queue.Queue(maxsize=QUEUE_SIZE)
+    errors = []
+    writer_thread = threading.Thread(target=writer_loop, args=(writer, frames, errors))
+    writer_thread.start()
+
+    start = time.perf_counter()
+    jobs = ((index, fps, size, params, writer.encoding) for index in range(first, frame_count))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Keep a bounded window of frames in flight and hand them to the
+            # writer in frame order
+            pending = deque()
+            for job in jobs:
+                pending.append(executor.submit(render_frame, job))
+                if len(pending) >= 2 * workers:
+                    frames.put(pending.popleft().result())
+                if errors:
+                    break
+            while pending and not errors:
+                frames.put(pending.popleft().result())
+    finally:
+        frames.put(None)
+        writer_thread.join()
+        writer.close()
+    if errors:
+        raise errors[0]
+
+    rendered = max(frame_count - first, 0)
+    elapsed = time.perf_counter() - start
+    if rendered:
+        print(f"Wrote {rendered} frames in {elapsed:.1f}s "
+              f"({rendered / fps / elapsed:.1f}x real time)")
+
+def parse_size(text):
+    width, _, height = text.partition("x")
+    return int(width), int(height)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the rotating wire-frame compound spirograph as a PNG sequence or GIF."
+    )
+    parser.add_argument("output", help="directory for a PNG sequence (resumable) or a .gif file")
+    parser.add_argument("--seconds", type=float, default=2 * math.pi,
+                        help="clip length (default: one full turn)")
+    parser.add_argument("--fps", type=float, default=60)
+    parser.add_argument("--size", type=parse_size, default=BASE_SIZE, help="WIDTHxHEIGHT (default 800x600)")
+    parser.add_argument("--R1", type=float, default=250)
+    parser.add_argument("--R2", type=float, default=150)
+    parser.add_argument("--r", type=float, default=50)
+    parser.add_argument("--d", type=float, default=30)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    frame_count = round(args.seconds * args.fps)
+    params = (args.R1, args.R2, args.r, args.d)
+    try:
+        export(args.output, frame_count, args.fps, args.size, params, args.workers)
+    except SettingsMismatch as error:
+        parser.error(str(error))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+import numpy as np
+import pygame
+from curves import compound, compound_period
+from raster import segment_pixels
+
+# A scrolling grid of thumbnails over the compound spirograph's parameter
+# space. The curves of a page are evaluated together, as one (batch,
+# samples) array, and rasterized together; a page is only rendered when it
+# first comes into view, and the most recently seen pages are kept.
+
+# Thumbnails per row, and rows per page (and on screen)
+COLUMNS = 16
+ROWS = 16
+# Points per thumbnail curve
+SAMPLES = 2048
+# Rendered pages kept for scrolling back
+CACHED_PAGES = 8
+HOVER_COLOR = (255, 255, 0)
+
+# Every combination of the given values, one per row, the first parameter
+# varying slowest
+def parameter_grid(*values):
+    grids = np.meshgrid(*values, indexing="ij")
+    return np.stack([grid.reshape(-1) for grid in grids], axis=1)
+
+# One period of each compound curve in `params` (rows of R1, R2, r, d),
+# scaled to fit a square of side `size` around (0, 0): (batch, samples, 2)
+def compound_thumbnails(params, size, samples=SAMPLES):
+    params = np.asarray(params, dtype=float)
+    periods = np.array([compound_period(R1, R2, r) for R1, R2, r, _ in params])
+    t = np.linspace(0, 1, samples) * periods[:, None]
+    R1, R2, r, d = params.T[:, :, None]
+    points = compound(R1, R2, r, d, t)
+    # Farthest the pen can get from the center
+    reach = np.abs(R1 - R2) + np.abs(R2 - r) + d
+    points *= (size / 2 - 1) / reach[:, :, None]
+    return points
+
+# Draw the curves of `points` (batch, samples, 2), each around (0, 0), into
+# a grid of cells of cell_size, the i-th in column i % columns and row
+# i // columns
+def draw_thumbnails(surface, points, cell_size, columns, color=(255, 255, 255)):
+    count = len(points)
+    cell = np.arange(count)
+    centers = np.column_stack(((cell % columns + 0.5) * cell_size[0], (cell // columns + 0.5) * cell_size[1]))
+    points = points + centers[:, None, :]
+    x, y, _ = segment_pixels(points[:, :-1].reshape(-1, 2), points[:, 1:].reshape(-1, 2))
+    pixels = pygame.surfarray.pixels2d(surface)
+    pixels[x, y] = surface.map_rgb(color)
+    del pixels  # Unlock the surface
+
+class Gallery:
+    def __init__(self, params, size, columns=COLUMNS, rows=ROWS):
+        self.params = params  # One row of R1, R2, r, d per thumbnail
+        self.size = size
+        self.columns, self.rows = columns, rows
+        self.cell_size = (size[0] / columns, size[1] / rows)
+        self.row_count = -(-len(params) // columns)
+        self.scroll = 0  # First row on screen
+        self.pages = OrderedDict()  # Page number -> surface, least recent first
+
+    def scroll_by(self, rows):
+        last = max(self.row_count - self.rows, 0)
+        self.scroll = min(max(self.scroll + rows, 0), last)
+
+    # The rendered surface of page `number`, rendering it if needed
+    def page(self, number):
+        surface = self.pages.pop(number, None)
+        if surface is None:
+            surface = pygame.Surface(self.size)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            surface.fill((0, 0, 0))
+            first = number * self.rows * self.columns
+            params = self.params[first:first + self.rows * self.columns]
+            points = compound_thumbnails(params, min(self.cell_size))
+            draw_thumbnails(surface, points, self.cell_size, self.columns)
+            if len(self.pages) >= CACHED_PAGES:
+                self.pages.popitem(last=False)
+        self.pages[number] = surface
+        return surface
+
+    # Draw the rows on screen, which span at most two pages, and outline the
+    # thumbnail `hovered` (an index into params) if given
+    def draw(self, target, hovered=None):
+        cell_width, cell_height = self.cell_size
+        first = self.scroll // self.rows
+        for number in (first, first + 1):
+            top = round((number * self.rows - self.scroll) * cell_height)
+            if number * self.rows >= self.row_count or top >= self.size[1]:
+                break
+            target.blit(self.page(number), (0, top))
+        if hovered is not None:
+            column, row = hovered % self.columns, hovered // self.columns - self.scroll
+            rect = pygame.Rect(round(column * cell_width), round(row * cell_height),
+                               round(cell_width), round(cell_height))
+            pygame.draw.rect(target, HOVER_COLOR, rect, 1)
+
+    # Index into params of the thumbnail at a screen position, or None
+    def index_at(self, pos):
+        column = int(pos[0] // self.cell_size[0])
+        row = int(pos[1] // self.cell_size[1]) + self.scroll
+        index = row * self.columns + column
+        if 0 <= column < self.columns and 0 <= index < len(self.params):
+            return index
+        return None
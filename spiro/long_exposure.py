@@ -0,0 +1,150 @@
+import argparse
+import os
+import time
+import numpy as np
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from curves import compound_period, compound_terms, hypotrochoid_period, hypotrochoid_terms
+from scenes import BASE_SIZE, FLAT_SCENES, SCENES
+
+# Render a spirograph as a long exposure: instead of drawing 1 px lines, the
+# pen's position is sampled millions of times over one period and every
+# sample adds light to a supersampled float32 buffer, so where the pen moves
+# slowly or the curve crosses itself the image gets brighter. The light is
+# then averaged down to the output size, which antialiases the curve, and
+# tone mapped (log, then gamma).
+#
+# The samples are made and binned a chunk at a time, so memory is bounded
+# by the chunk and the buffer whatever the number of points.
+
+POINTS = 16_000_000
+# Buffer pixels per output pixel along each axis
+SUPERSAMPLE = 4
+# Points evaluated and binned at a time
+CHUNK = 1 << 20
+# Light that comes out white: this percentile of the lit image pixels
+WHITE_PERCENTILE = 99.5
+# How strongly the log curve compresses bright areas against faint ones
+CONTRAST = 50.0
+GAMMA = 2.2
+
+def scene_terms(scene, params):
+    p = params
+    if scene == "spirograph":
+        return hypotrochoid_terms(p["R"], p["r"], p["d"]), hypotrochoid_period(p["R"], p["r"])
+    return compound_terms(p["R1"], p["R2"], p["r"], p["d"]), compound_period(p["R1"], p["R2"], p["r"])
+
+# Add `points` samples of the curve, spread evenly over one period, to the
+# light in `buffer` (rows, columns). The curve is `terms` (see
+# curves.hypotrochoid_terms) scaled by `scale` buffer pixels per unit around
+# `center`.
+#
+# Consecutive chunks differ only by a phase, so every term's exp(i w t)
+# over a chunk is tabled once and each chunk costs one complex multiply-add
+# per term and point instead of two trig calls.
+def accumulate(buffer, terms, period, points, center, scale, chunk=CHUNK):
+    height, width = buffer.shape
+    light = buffer.reshape(-1)
+    step = period / points
+    chunk = min(chunk, points)
+    steps = np.arange(chunk) * step
+    tables = [np.exp(1j * w * steps).astype(np.complex64) for _, w in terms]
+    # Curves that stay inside the buffer need no clipping
+    reach = scale * sum(abs(a) for a, _ in terms)
+    inside = (reach <= center[0] < width - reach) and (reach <= center[1] < height - reach)
+
+    z = np.empty(chunk, dtype=np.complex64)
+    term = np.empty(chunk, dtype=np.complex64)
+    for start in range(0, points, chunk):
+        n = min(chunk, points - start)
+        z[:n] = complex(*center)
+        t0 = start * step
+        for (a, w), table in zip(terms, tables):
+            np.multiply(table[:n], np.complex64(a * scale * np.exp(1j * w * t0)), out=term[:n])
+            z[:n] += term[:n]
+
+        xy = z[:n].view(np.float32).reshape(-1, 2)
+        if not inside:
+            x, y = xy[:, 0], xy[:, 1]
+            xy = xy[(x >= 0) & (x < width) & (y >= 0) & (y < height)]
+        pixels = xy.astype(np.int32)
+        add_light(light, pixels[:, 1] * width + pixels[:, 0])
+
+# Add one unit of light at each flat index. Binning by sorting costs time
+# for the chunk only; np.bincount(minlength=) would also clear and add a
+# whole buffer's worth of counts for every chunk.
+def add_light(light, index):
+    if not len(index):
+        return
+    index = np.sort(index)
+    starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+    light[index[starts]] += np.diff(np.r_[starts, len(index)])
+
+# Map the light in place to 0..1: log, so the faint single passes and the
+# bright crossings both show, then gamma for display
+def tone_map(light, exposure=1.0, gamma=GAMMA):
+    lit = light[light > 0]
+    white = np.percentile(lit, WHITE_PERCENTILE) if lit.size else 1.0
+    light *= exposure * CONTRAST / white
+    np.log1p(light, out=light)
+    light *= 1 / np.log1p(CONTRAST)
+    np.clip(light, 0, 1, out=light)
+    light **= 1 / gamma
+    return light
+
+# Average blocks of `factor` x `factor` pixels
+def downsample(image, factor):
+    height, width = image.shape[0] // factor, image.shape[1] // factor
+    return image.reshape(height, factor, width, factor).mean(axis=(1, 3), dtype=np.float32)
+
+# The scene as an RGB array (rows, columns, 3) of the given size
+def render(scene, params, size, points=POINTS, supersample=SUPERSAMPLE, exposure=1.0, gamma=GAMMA,
+           color=(255, 255, 255)):
+    width, height = size
+    buffer = np.zeros((height * supersample, width * supersample), dtype=np.float32)
+    terms, period = scene_terms(scene, params)
+    # Scaled up from the scripts' window like batch_render.py
+    scale = min(width / BASE_SIZE[0], height / BASE_SIZE[1]) * supersample
+    center = ((width // 2 + 0.5) * supersample, (height // 2 + 0.5) * supersample)
+    accumulate(buffer, terms, period, points, center, scale)
+    image = tone_map(downsample(buffer, supersample), exposure, gamma)
+    return np.rint(image[:, :, None] * np.array(color, dtype=np.float32)).astype(np.uint8)
+
+def parse_size(text):
+    width, _, height = text.partition("x")
+    return int(width), int(height)
+
+def parse_color(text):
+    return tuple(int(v) for v in text.split(","))
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a spirograph as a long exposure of its pen.")
+    parser.add_argument("scene", choices=FLAT_SCENES)
+    parser.add_argument("output", help="image file to write, e.g. exposure.png")
+    for name in ["R", "R1", "R2", "r", "d"]:
+        parser.add_argument(f"--{name}", type=float, help="default: the script's slider start value")
+    parser.add_argument("--size", type=parse_size, default=BASE_SIZE, help="image size (default 800x600)")
+    parser.add_argument("--points", type=int, default=POINTS, help=f"pen samples (default {POINTS})")
+    parser.add_argument("--supersample", type=int, default=SUPERSAMPLE,
+                        help=f"buffer pixels per image pixel along each axis (default {SUPERSAMPLE})")
+    parser.add_argument("--exposure", type=float, default=1.0, help="brightness multiplier")
+    parser.add_argument("--gamma", type=float, default=GAMMA)
+    parser.add_argument("--color", type=parse_color, default=(255, 255, 255), help="light color as R,G,B")
+    args = parser.parse_args()
+
+    params = {name: getattr(args, name) if getattr(args, name) is not None else value
+              for name, value in SCENES[args.scene].items()}
+    start = time.perf_counter()
+    image = render(args.scene, params, args.size, args.points, args.supersample, args.exposure, args.gamma,
+                   args.color)
+    seconds = time.perf_counter() - start
+
+    pygame.image.save(pygame.surfarray.make_surface(image.swapaxes(0, 1)), args.output)
+    print(f"Rendered {args.points} points in {seconds:.2f} s "
+          f"({args.points / seconds / 1e6:.0f}M points/s) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
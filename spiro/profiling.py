@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+
+# Per-stage frame timings. Drawing code marks its stages with
+#   with stage("project"):
+#       ...
+# which costs next to nothing until a Profiler is installed with enable().
+# Stages nest, and each is charged only its own time, not the time of the
+# stages inside it, so the stages of a frame add up to the frame time.
+# Only the main thread's stages count: work done by a background worker (see
+# worker.py) is not part of any frame.
+
+_NO_STAGE = nullcontext()
+_MAIN_THREAD = threading.main_thread()
+_profiler = None
+_overlay_font = None
+
+class _Stage:
+    def __init__(self, profiler, name):
+        self.profiler, self.name = profiler, name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.children = 0.0  # Time spent in nested stages
+        self.profiler.stack.append(self)
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = self.profiler.stack
+        stack.pop()
+        self.profiler.current[self.name] += elapsed - self.children
+        if stack:
+            stack[-1].children += elapsed
+
+class Profiler:
+    def __init__(self, window=60):
+        self.stack = []
+        self.current = defaultdict(float)  # Seconds per stage in this frame
+        self.counts = defaultdict(int)
+        self.frames = deque(maxlen=window)  # (end time, stage times, counts)
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def end_frame(self):
+        self.frames.append((time.perf_counter(), dict(self.current), dict(self.counts)))
+        self.current.clear()
+        self.counts.clear()
+
+    def clear(self):
+        self.frames.clear()
+        self.current.clear()
+        self.counts.clear()
+
+    # Mean milliseconds per frame of every stage over the recorded frames
+    def stage_ms(self):
+        totals = defaultdict(float)
+        for _, stages, _ in self.frames:
+            for name, seconds in stages.items():
+                totals[name] += seconds
+        return {name: 1000 * seconds / len(self.frames) for name, seconds in totals.items()}
+
+    # Mean of each count per frame
+    def mean_counts(self):
+        totals = defaultdict(int)
+        for _, _, counts in self.frames:
+            for name, count in counts.items():
+                totals[name] += count
+        return {name: count / len(self.frames) for name, count in totals.items()}
+
+    # Frames per second over the recorded frames
+    def fps(self):
+        if len(self.frames) < 2:
+            return 0.0
+        return (len(self.frames) - 1) / (self.frames[-1][0] - self.frames[0][0])
+
+def enable(window=60):
+    global _profiler
+    _profiler = Profiler(window)
+    return _profiler
+
+def disable():
+    global _profiler
+    _profiler = None
+
+def active_profiler():
+    return _profiler
+
+def stage(name):
+    if _profiler and threading.current_thread() is _MAIN_THREAD:
+        return _profiler.stage(name)
+    return _NO_STAGE
+
+# Add n to a per-frame count such as the number of points drawn
+def count(name, n):
+    if _profiler and threading.current_thread() is _MAIN_THREAD:
+        _profiler.counts[name] += n
+
+def end_frame():
+    if _profiler:
+        _profiler.end_frame()
+
+# Rolling fps and per-stage breakdown in the top right corner of `surface`
+def draw_overlay(surface, profiler):
+    global _overlay_font
+    import pygame
+
+    if _overlay_font is None:
+        pygame.font.init()
+        _overlay_font = pygame.font.Font(None, 18)  # pygame's bundled font
+    font = _overlay_font
+    stages = sorted(profiler.stage_ms().items(), key=lambda item: -item[1])
+    lines = [f"{profiler.fps():5.1f} fps  {sum(ms for _, ms in stages):6.2f} ms"]
+    lines += [f"{name:>8} {ms:6.2f} ms" for name, ms in stages]
+    for name, value in sorted(profiler.mean_counts().items()):
+        lines.append(f"{name:>8} {value:8.0f}")
+
+    images = [font.render(line, True, (255, 255, 0)) for line in lines]
+    width = max(image.get_width() for image in images) + 8
+    height = sum(image.get_height() for image in images) + 8
+    left = surface.get_width() - width - 4
+    pygame.draw.rect(surface, (0, 0, 0), (left, 4, width, height))
+    y = 8
+    for image in images:
+        surface.blit(image, (left + 4, y))
+        y += image.get_height()
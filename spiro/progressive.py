@@ -0,0 +1,110 @@
+import time
+import pygame
+from profiling import count, stage
+
+# Time per frame spent refining the curve, in ms; leaves the rest of a 60 fps
+# frame for drawing it and the UI
+BUDGET_MS = 8
+# The first preview has this many times fewer points than the starting grid
+PREVIEW = 8
+# Midpoints evaluated between checks of the time budget
+CHUNK = 4096
+
+# Draws a curve progressively: a coarse preview in the first frame after the
+# parameters change, then finer stages within a per-frame time budget until
+# the full curve is drawn. When the parameters change again, the unfinished
+# work is dropped. Finished curves go into an optional CurveCache.
+#
+# Drawing dense curves can cost more than the budget on its own, so a finer
+# unfinished stage is skipped (the coarser one stays on screen) when drawing
+# it is expected to overrun; the finished curve is always drawn.
+class ProgressiveCurve:
+    def __init__(self, passes, render, size, cache=None, quick_render=None, budget_ms=BUDGET_MS):
+        # passes(*key, preview=, chunk=) yields results coarse to fine, or
+        # None while a stage is unfinished (see scenes.compound_spirograph_passes)
+        self.passes = passes
+        self.render = render  # render(surface, result) draws a result
+        # Cheaper render for the unfinished stages, if the full one is slow
+        self.quick_render = quick_render or render
+        self.size = size
+        self.cache = cache
+        self.budget = budget_ms / 1000
+        self.key = None
+        self.stages = None  # Remaining stages for self.key
+        self.result = None
+        self.surface = None
+        self.drawn_stage = False  # The surface shows an unfinished stage
+        self.seconds_per_point = 0.0  # Measured cost of quick_render
+
+    # Draw the curve for `key` as far as it has got onto `target`; returns
+    # True while there is refinement left for later frames
+    def draw(self, target, key):
+        if key != self.key:
+            self.start(key)
+        elif self.stages is not None:
+            self.refine()
+        target.blit(self.surface, (0, 0))
+        return self.stages is not None
+
+    def start(self, key):
+        self.key = key
+        entry = self.cache.lookup(key) if self.cache else None
+        if entry is not None:
+            self.stages = None
+            self.surface = entry.surface
+            return
+        self.stages = self.passes(*key, preview=PREVIEW, chunk=CHUNK)
+        self.refine(first=True)
+
+    # Advance through the stages until the frame's budget is used, and
+    # redraw if a finer result came out. The first call for a key stops at
+    # the preview, so moving a slider always gets a frame straight away.
+    def refine(self, first=False):
+        deadline = time.perf_counter() + self.budget
+        result = None
+        with stage("sample"):
+            for result_or_none in self.stages:
+                if result_or_none is not None:
+                    result = result_or_none
+                    if first:
+                        break
+                if time.perf_counter() >= deadline:
+                    break
+            else:
+                self.stages = None  # Finished
+
+        if result is not None:
+            self.result = result
+        finished = self.stages is None
+        if finished:
+            count("points", point_count(self.result))
+            if result is not None or self.drawn_stage:
+                self.draw_result(self.render)
+        elif result is not None:
+            remaining = deadline + self.budget - time.perf_counter()
+            if first or self.seconds_per_point * point_count(result) < remaining:
+                start = time.perf_counter()
+                self.draw_result(self.quick_render)
+                self.seconds_per_point = (time.perf_counter() - start) / point_count(result)
+        if self.stages is None and self.cache is not None:
+            self.cache.store(self.key, self.result, self.surface)
+
+    def draw_result(self, render):
+        self.surface = self.new_surface()
+        render(self.surface, self.result)
+        self.drawn_stage = render is self.quick_render and self.stages is not None
+
+    def new_surface(self):
+        if self.cache is not None:
+            return self.cache.new_surface()
+        surface = pygame.Surface(self.size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill((0, 0, 0))
+        return surface
+
+# Points in a result of the passes: an array of points, or a tuple starting
+# with one
+def point_count(result):
+    points = result[0] if isinstance(result, tuple) else result
+    return max(1, len(points))
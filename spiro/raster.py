@@ -0,0 +1,213 @@
+import numpy as np
+import pygame
+
+# The near plane: parts of segments nearer than this w (see camera.depth)
+# are behind or too close to the camera, and are cut off by
+# draw_depth_polyline
+NEAR = 0.05
+
+# Clip segments p0 -> p1 to [0, width) x [0, height) (Liang-Barsky, all
+# segments at once). Returns the parameters along each segment where it
+# enters and leaves the area, and a mask of the segments that are at least
+# partly visible.
+def clip_parameters(p0, p1, width, height):
+    delta = p1 - p0
+    t_enter = np.zeros(len(p0))
+    t_exit = np.ones(len(p0))
+    visible = np.ones(len(p0), dtype=bool)
+    for p, q in (
+        (-delta[:, 0], p0[:, 0]),
+        (delta[:, 0], width - 1 - p0[:, 0]),
+        (-delta[:, 1], p0[:, 1]),
+        (delta[:, 1], height - 1 - p0[:, 1]),
+    ):
+        parallel = p == 0
+        visible &= ~(parallel & (q < 0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = q / p
+        t_enter = np.where(~parallel & (p < 0), np.maximum(t_enter, ratio), t_enter)
+        t_exit = np.where(~parallel & (p > 0), np.minimum(t_exit, ratio), t_exit)
+    visible &= t_enter <= t_exit
+    return t_enter, t_exit, visible
+
+# Clip the segments that reach outside a width x height surface and drop
+# the hidden ones. Returns the new endpoints, the parameters along the
+# original segments where they now start and end, and the indices of the
+# segments kept.
+def clip_to_surface(p0, p1, width, height):
+    limit = (width - 1, height - 1)
+    inside = ((p0 >= 0) & (p0 <= limit) & (p1 >= 0) & (p1 <= limit)).all(axis=1)
+    t_enter, t_exit = np.zeros(len(p0)), np.ones(len(p0))
+    if inside.all():
+        return p0, p1, t_enter, t_exit, np.arange(len(p0))
+
+    # Only segments reaching outside the surface need clipping
+    outside = np.flatnonzero(~inside)
+    enter, exit, visible = clip_parameters(p0[outside], p1[outside], width, height)
+    clipped = outside[visible]
+    delta = p1[clipped] - p0[clipped]
+    p0, p1 = p0.copy(), p1.copy()
+    p0[clipped], p1[clipped] = (p0[clipped] + delta * enter[visible, None],
+                                p0[clipped] + delta * exit[visible, None])
+    t_enter[clipped], t_exit[clipped] = enter[visible], exit[visible]
+    inside[clipped] = True
+    kept = np.flatnonzero(inside)
+    return p0[kept], p1[kept], t_enter[kept], t_exit[kept], kept
+
+# Cut the segments that cross the near plane where they cross it, and drop
+# the ones entirely behind it. A screen point times its w is linear along a
+# segment in 3D, so the cut is exact. Returns the new endpoints and depths,
+# and the indices of the segments kept.
+def clip_near(p0, p1, depth0, depth1):
+    front0, front1 = depth0 > NEAR, depth1 > NEAR
+    if (front0 & front1).all():
+        return p0, p1, depth0, depth1, np.arange(len(p0))
+
+    kept = np.flatnonzero(front0 | front1)
+    p0, p1, depth0, depth1 = p0[kept], p1[kept], depth0[kept], depth1[kept]
+    cut = np.flatnonzero(~(front0[kept] & front1[kept]))
+    w0, w1 = depth0[cut, None], depth1[cut, None]
+    s = (w0 - NEAR) / (w0 - w1)
+    with np.errstate(invalid="ignore"):
+        point = (p0[cut] * w0 + (p1[cut] * w1 - p0[cut] * w0) * s) / NEAR
+    behind = depth1[cut] <= NEAR
+    p1[cut[behind]], depth1[cut[behind]] = point[behind], NEAR
+    p0[cut[~behind]], depth0[cut[~behind]] = point[~behind], NEAR
+
+    # An end exactly at w = 0 projects to infinity and gives no cut
+    finite = np.ones(len(kept), dtype=bool)
+    finite[cut] = np.isfinite(point).all(axis=1)
+    return p0[finite], p1[finite], depth0[finite], depth1[finite], kept[finite]
+
+# Pixel coordinates covered by each segment, one DDA walk for all segments.
+# Returns x, y and the index of the segment every pixel belongs to. With
+# `attribute`, a pair of per-segment arrays holding a value at p0 and p1,
+# also returns the value linearly interpolated at every pixel, as float32.
+def segment_pixels(p0, p1, attribute=None):
+    delta = p1 - p0
+    steps = np.ceil(np.abs(delta).max(axis=1)).astype(np.int32)
+    counts = steps + 1
+    starts = np.cumsum(counts) - counts
+    offset = np.arange(counts.sum(), dtype=np.int32) - np.repeat(starts, counts)
+    increment = delta / np.maximum(steps, 1)[:, None]
+    x = np.rint(np.repeat(p0[:, 0], counts) + np.repeat(increment[:, 0], counts) * offset).astype(np.int32)
+    y = np.rint(np.repeat(p0[:, 1], counts) + np.repeat(increment[:, 1], counts) * offset).astype(np.int32)
+    segment = np.repeat(np.arange(len(p0), dtype=np.int32), counts)
+    if attribute is None:
+        return x, y, segment
+    start, end = attribute
+    slope = ((end - start) / np.maximum(steps, 1)).astype(np.float32)
+    values = np.repeat(slope, counts)
+    values *= offset
+    values += np.repeat(start.astype(np.float32), counts)
+    return x, y, segment, values
+
+# A depth buffer for draw_depth_polyline(): the inverse depth 1 / w of the
+# nearest point drawn at every pixel, indexed [y, x] like the rows of the
+# image, and 0 where nothing has been drawn
+def depth_buffer(surface):
+    width, height = surface.get_size()
+    return np.zeros((height, width), dtype=np.float32)
+
+# Draw the polyline through `points`, segment i - 1 -> i in colors[i], with a
+# depth test: `depth` holds every point's w (camera.depth), and each pixel is
+# only written if it is nearer than what the depth buffer already holds
+# there, so near parts of the curve hide far ones whatever order they are
+# drawn in. `colors` is an (N, 3) array or one color for the whole curve; see
+# draw_depth_segments() for the rest.
+def draw_depth_polyline(surface, points, depth, colors, width=1, fog=0.0, background=(0, 0, 0), zbuffer=None):
+    points = np.asarray(points, dtype=float)
+    if len(points) < 2:
+        return
+    depth = np.asarray(depth, dtype=float)
+    colors = np.broadcast_to(np.asarray(colors), (len(points), 3))
+    draw_depth_segments(surface, points[:-1], points[1:], depth[:-1], depth[1:], colors[1:],
+                        width, fog, background, zbuffer)
+
+# Depth-tested segments p0 -> p1 with depths depth0 and depth1 at their ends,
+# segment i in colors[i] (or all in one color). 1 / w is interpolated along
+# the segments, which is exact under perspective. Segments are cut at the
+# near plane (see clip_near).
+#
+# `fog` fades segments toward `background` with distance, from nothing at the
+# nearest segment to `fog` (0 to 1) at the farthest. Pass the same `zbuffer`
+# to several calls to hide their lines behind each other as well.
+def draw_depth_segments(surface, p0, p1, depth0, depth1, colors, width=1, fog=0.0, background=(0, 0, 0),
+                        zbuffer=None):
+    if zbuffer is None:
+        zbuffer = depth_buffer(surface)
+    surface_width, surface_height = surface.get_size()
+
+    depth0, depth1 = np.asarray(depth0, dtype=float), np.asarray(depth1, dtype=float)
+    colors = np.broadcast_to(np.asarray(colors), (len(depth0), 3))
+    p0, p1, depth0, depth1, front = clip_near(np.asarray(p0, dtype=float), np.asarray(p1, dtype=float),
+                                              depth0, depth1)
+    inverse0, inverse1 = 1 / depth0, 1 / depth1
+    colors = colors[front]
+    if fog and len(front):
+        middle = (depth0 + depth1) / 2
+        nearest, farthest = middle.min(), middle.max()
+        amount = fog * (middle - nearest) / max(farthest - nearest, 1e-9)
+        colors = np.rint(colors + (np.asarray(background) - colors) * amount[:, None])
+    values = map_colors(surface, colors)
+
+    # Thick lines are copies of the thin one shifted by `offsets` across each
+    # segment's minor axis, like pygame.draw.line; the thin line is clipped so
+    # that every copy stays on the surface
+    offsets = np.arange(width) - (width - 1) // 2
+    low, high = -offsets[0], offsets[-1]
+    p0, p1, t_enter, t_exit, kept = clip_to_surface(p0 - low, p1 - low, surface_width - low - high,
+                                                    surface_height - low - high)
+    change = inverse1[kept] - inverse0[kept]
+    inverse = (inverse0[kept] + change * t_enter, inverse0[kept] + change * t_exit)
+    x, y, segment, pixel_inverse = segment_pixels(p0 + low, p1 + low, inverse)
+    values = values[kept]
+
+    # Pixels as indices into the rows of the image, where the copies are a
+    # shift by 1 (across a steep segment) or by a row
+    index = y * surface_width + x
+    if width > 1:
+        delta = p1 - p0
+        shift = np.where(np.abs(delta[:, 1]) > np.abs(delta[:, 0]), 1, surface_width).astype(np.int32)
+        shift = shift[segment]
+        index = np.concatenate([index + offset * shift for offset in offsets])
+        segment = np.tile(segment, width)
+        pixel_inverse = np.tile(pixel_inverse, width)
+
+    # Keep the nearest write to every pixel, against earlier calls as well
+    flat = zbuffer.reshape(-1)
+    np.maximum.at(flat, index, pixel_inverse)
+    nearest = pixel_inverse >= flat[index]
+    write_indexed_pixels(surface, index[nearest], values[segment[nearest]])
+
+# Pack (N, 3) RGB colors into the surface's 32-bit pixel format; other
+# formats keep the RGB triples
+def map_colors(surface, colors):
+    if surface.get_bytesize() != 4:
+        return colors.astype(np.uint8)
+    colors = colors.astype(np.uint32)
+    r_shift, g_shift, b_shift, _ = surface.get_shifts()
+    alpha_mask = surface.get_masks()[3]
+    return (colors[:, 0] << r_shift) | (colors[:, 1] << g_shift) | (colors[:, 2] << b_shift) | alpha_mask
+
+# Set pixel (x[i], y[i]) to values[i] from map_colors; when a pixel repeats
+# the last write wins
+def write_pixels(surface, x, y, values):
+    if values.ndim == 1:
+        pixels = pygame.surfarray.pixels2d(surface)
+    else:
+        pixels = pygame.surfarray.pixels3d(surface)
+    pixels[x, y] = values
+    del pixels  # Unlock the surface
+
+# write_pixels() for pixels given as y * width + x
+def write_indexed_pixels(surface, index, values):
+    width = surface.get_width()
+    if values.ndim == 1:
+        rows = pygame.surfarray.pixels2d(surface).T
+        if rows.flags.c_contiguous:
+            rows.reshape(-1)[index] = values
+            del rows  # Unlock the surface
+            return
+        del rows
+    write_pixels(surface, index % width, index // width, values)
@@ -0,0 +1,73 @@
+import math
+import numpy as np
+
+# Largest allowed distance, in screen pixels, between the curve and its chords
+TOLERANCE = 0.25
+# Samples per cycle of the fastest frequency in the starting grid
+SAMPLES_PER_CYCLE = 16
+# Each pass can at most double the number of points
+MAX_PASSES = 12
+
+# Step of the starting grid for curves mixing the given frequencies (in cycles
+# per turn of t), fine enough that no loop falls between two samples
+def initial_step(*frequencies):
+    fastest = max([1.0] + [abs(float(f)) for f in frequencies])
+    return 2 * math.pi / (SAMPLES_PER_CYCLE * fastest)
+
+# Adaptively sample curve(t) -> (N, 2) screen points over [t0, t1].
+# Every pass evaluates the midpoints of all unfinished intervals in one batch
+# and splits those whose midpoint lies further than `tolerance` from the chord.
+# Intervals with both ends outside `viewport` (width, height) are left alone.
+# Returns the t values and the matching points, ready for pygame.draw.lines.
+def adaptive_sample(curve, t0, t1, step, tolerance=TOLERANCE, viewport=None, max_passes=MAX_PASSES):
+    for t, points in adaptive_passes(curve, t0, t1, step, tolerance, viewport, max_passes):
+        pass
+    return t, np.ascontiguousarray(points)
+
+# adaptive_sample() one stage at a time, for progressive drawing: yields
+# (t, points) for the starting grid and again after every pass that split
+# anything, the last being adaptive_sample()'s result. `preview` first yields
+# a grid that many times coarser. With `chunk`, a pass evaluates at most that
+# many midpoints at a time and yields None between batches, so the caller can
+# spread a long pass over several frames.
+def adaptive_passes(curve, t0, t1, step, tolerance=TOLERANCE, viewport=None, max_passes=MAX_PASSES,
+                    preview=None, chunk=None):
+    intervals = max(2, math.ceil((t1 - t0) / step))
+    if preview:
+        t = np.linspace(t0, t1, max(2, intervals // preview) + 1)
+        yield t, curve(t)
+
+    t = np.linspace(t0, t1, intervals + 1)
+    points = curve(t)
+    yield t, points
+    active = np.arange(len(t) - 1)  # Intervals still to be checked
+
+    for _ in range(max_passes):
+        if viewport is not None:
+            inside = ((points >= 0) & (points < viewport)).all(axis=1)
+        batch = chunk or len(active)
+        split_at, t_split, mid_split = [], [], []
+        for start in range(0, len(active), batch):
+            if start:
+                yield None
+            part = active[start:start + batch]
+            t_mid = (t[part] + t[part + 1]) / 2
+            mid = curve(t_mid)
+            error = np.hypot(*(mid - (points[part] + points[part + 1]) / 2).T)
+            split = error > tolerance
+            if viewport is not None:
+                split &= inside[part] | inside[part + 1]
+            split_at.append(part[split])
+            t_split.append(t_mid[split])
+            mid_split.append(mid[split])
+
+        split_at = np.concatenate(split_at)
+        if not len(split_at):
+            break
+
+        # Insert the midpoints; both halves of a split interval stay active
+        t = np.insert(t, split_at + 1, np.concatenate(t_split))
+        points = np.insert(points, split_at + 1, np.concatenate(mid_split), axis=0)
+        shifted = split_at + np.arange(len(split_at))
+        active = np.sort(np.concatenate((shifted, shifted + 1)))
+        yield t, points
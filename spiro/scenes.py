@@ -0,0 +1,276 @@
+import math
+import numpy as np
+import pygame
+from camera import depth, perspective, project, rotation_x, rotation_y, rotation_z, transform, twist
+from color import hsv_to_rgb
+from profiling import count, stage
+from curves import T_MAX, compound, compound_period, hypotrochoid, hypotrochoid_period
+from raster import draw_depth_polyline, draw_depth_segments
+from sampling import TOLERANCE, adaptive_passes, adaptive_sample, initial_step
+
+# Geometry of every spirograph scene, shared by the interactive scripts and
+# the batch renderer. Sizes are in pixels of the original 800x600 window:
+# `scale` enlarges them for other resolutions, and curves are centered on
+# a surface of the given `size`.
+
+# Window size of the scripts; renders at other sizes scale up from it
+BASE_SIZE = (800, 600)
+# Parameters of every scene, with the scripts' slider start values
+SCENES = {
+    "spirograph": {"R": 200, "r": 50, "d": 80},
+    "compound": {"R1": 250, "R2": 150, "r": 50, "d": 30},
+    "spirograph3d": {"R": 200, "r": 50, "d": 80, "tilt": 45},
+    "compound3d": {"R1": 250, "R2": 150, "r": 50, "d": 30, "tilt_x": 30, "tilt_y": 30},
+    "wireframe": {"R1": 250, "R2": 150, "r": 50, "d": 30, "angle": 0.0},
+}
+# The scenes that are one flat curve
+FLAT_SCENES = ["compound", "spirograph"]
+
+# pygame keeps the GIL while it draws, so long polylines are drawn in runs of
+# this many points to let the UI thread in while a worker draws a curve
+DRAW_RUN = 1024
+
+# Camera distances of the 3D scenes (the focal of camera.perspective), in
+# curve units. Each is beyond the farthest any point of the scene's curve
+# gets from its center over the sliders' ranges, so the whole curve is in
+# front of the near plane.
+SPIROGRAPH_3D_FOCAL = 450  # The curve reaches R - r + d <= 390
+COMPOUND_3D_FOCAL = 500  # The curve reaches |R1 - R2| + |R2 - r| + d <= 440
+WIREFRAME_FOCAL = -500  # Seen from the other side, like the original camera
+
+def compound_step(R1, R2, r):
+    middle = (R1 - R2) / R2
+    return initial_step(middle, middle + (R2 - r) / r)
+
+# The spirograph as a function of t, in screen pixels
+def hypotrochoid_curve(size, R, r, d, scale=1.0):
+    center = (size[0] // 2, size[1] // 2)
+
+    def curve(t):
+        with stage("curve"):
+            return hypotrochoid(R, r, d, t) * scale + center
+
+    return curve
+
+def spirograph_points(size, R, r, d, scale=1.0, tolerance=TOLERANCE):
+    curve = hypotrochoid_curve(size, R, r, d, scale)
+    step = initial_step((R - r) / r)
+    with stage("sample"):
+        _, points = adaptive_sample(curve, 0, hypotrochoid_period(R, r), step, tolerance, size)
+    count("points", len(points))
+    return points
+
+# spirograph_points() coarse to fine, like compound_spirograph_passes()
+def spirograph_passes(size, R, r, d, scale=1.0, tolerance=TOLERANCE, preview=None, chunk=None):
+    curve = hypotrochoid_curve(size, R, r, d, scale)
+    step = initial_step((R - r) / r)
+    for result in adaptive_passes(curve, 0, hypotrochoid_period(R, r), step, tolerance, size,
+                                  preview=preview, chunk=chunk):
+        yield None if result is None else result[1]
+
+# The compound spirograph as a function of t, in screen pixels
+def compound_curve(size, R1, R2, r, d, scale=1.0):
+    center = (size[0] // 2, size[1] // 2)
+
+    def curve(t):
+        with stage("curve"):
+            return compound(R1, R2, r, d, t) * scale + center
+
+    return curve
+
+def compound_spirograph_points(size, R1, R2, r, d, scale=1.0, tolerance=TOLERANCE):
+    curve = compound_curve(size, R1, R2, r, d, scale)
+    step = compound_step(R1, R2, r)
+    with stage("sample"):
+        _, points = adaptive_sample(curve, 0, compound_period(R1, R2, r), step, tolerance, size)
+    count("points", len(points))
+    return points
+
+# compound_spirograph_points() coarse to fine: yields the points of every
+# stage of the sampling (see adaptive_passes), or None while a stage is
+# still being worked on
+def compound_spirograph_passes(size, R1, R2, r, d, scale=1.0, tolerance=TOLERANCE, preview=None, chunk=None):
+    curve = compound_curve(size, R1, R2, r, d, scale)
+    step = compound_step(R1, R2, r)
+    for result in adaptive_passes(curve, 0, compound_period(R1, R2, r), step, tolerance, size,
+                                  preview=preview, chunk=chunk):
+        yield None if result is None else result[1]
+
+# The tilted and twisted 3D spirograph, the same curve projected to 2D, and
+# the projection matrix
+def tilted_spirograph_curves(size, R, r, d, tilt_angle, scale=1.0):
+    # Tilt about the X axis, then perspective onto the center of the screen
+    model = rotation_x(math.radians(tilt_angle))
+    projection = perspective(SPIROGRAPH_3D_FOCAL, scale, (size[0] // 2, size[1] // 2))
+
+    def rotated_curve(t):
+        with stage("curve"):
+            points = np.column_stack((hypotrochoid(R, r, d, t), np.zeros(len(t))))
+        with stage("rotate"):
+            points = transform(points, model)
+            return twist(points, t * 0.01, "y")  # This creates the rotation around the Y-axis as the spirograph is drawn
+
+    def curve(t):
+        points = rotated_curve(t)
+        with stage("project"):
+            return project(points, projection)
+
+    return rotated_curve, curve, projection
+
+# Returns the projected points and their depths
+def spirograph_3d_points(size, R, r, d, tilt_angle, scale=1.0, tolerance=TOLERANCE):
+    rotated_curve, curve, projection = tilted_spirograph_curves(size, R, r, d, tilt_angle, scale)
+    step = initial_step((R - r) / r)
+    with stage("sample"):
+        t, points = adaptive_sample(curve, 0, T_MAX, step, tolerance, size)
+    count("points", len(points))
+    return points, point_depths(rotated_curve, projection, t)
+
+# spirograph_3d_points() coarse to fine, like compound_spirograph_passes(),
+# except that the depths come as a function that computes them, so stages
+# that are never drawn cost nothing more
+def spirograph_3d_passes(size, R, r, d, tilt_angle, scale=1.0, tolerance=TOLERANCE, preview=None, chunk=None):
+    rotated_curve, curve, projection = tilted_spirograph_curves(size, R, r, d, tilt_angle, scale)
+    step = initial_step((R - r) / r)
+    for result in adaptive_passes(curve, 0, T_MAX, step, tolerance, size, preview=preview, chunk=chunk):
+        if result is None:
+            yield None
+        else:
+            t, points = result
+            yield points, lambda t=t: point_depths(rotated_curve, projection, t)
+
+# Depth (camera.depth) of the points of a 3D curve at t
+def point_depths(rotated_curve, projection, t):
+    points = rotated_curve(t)
+    with stage("project"):
+        return depth(points, projection)
+
+def get_color(x, y, z, t, max_distance):
+    # Works on whole arrays of points, returning an (N, 3) array of colors
+    # Normalize x, y, z to [0, 1] range
+    x_norm = (x + max_distance) / (2 * max_distance)
+    y_norm = (y + max_distance) / (2 * max_distance)
+    z_norm = (z + max_distance) / (2 * max_distance)
+
+    # Use x, y, z for Hue, Saturation, Value respectively
+    h = (x_norm + y_norm + t / (math.pi * 200)) % 1  # Hue cycles through colors and changes with time
+    s = 0.7 + (0.3 * z_norm)  # Saturation varies with z
+    v = 0.5 + (0.5 * y_norm)  # Value (brightness) varies with y
+
+    # Convert HSV to RGB
+    rgb = hsv_to_rgb(h, s, v)
+    return (rgb * 255).astype(np.uint8)
+
+# The tilted and twisted 3D curve, the same curve projected to 2D, and the
+# projection matrix
+def compound_spirograph_3d_curves(size, R1, R2, r, d, tilt_x, tilt_y, scale=1.0):
+    # Tilt about the X then the Y axis, then perspective onto the center of the screen
+    model = rotation_y(math.radians(tilt_y)) @ rotation_x(math.radians(tilt_x))
+    projection = perspective(COMPOUND_3D_FOCAL, scale, (size[0] // 2, size[1] // 2))
+
+    def rotated_curve(t):
+        with stage("curve"):
+            points = np.column_stack((compound(R1, R2, r, d, t), np.zeros(len(t))))
+        with stage("rotate"):
+            points = transform(points, model)
+            return twist(points, t * 0.01, "z")  # This creates a rotation around the Z-axis as the spirograph is drawn
+
+    def curve(t):
+        # Project 3D points to 2D
+        points = rotated_curve(t)
+        with stage("project"):
+            return project(points, projection)
+
+    return rotated_curve, curve, projection
+
+# Returns the projected points, their colors and their depths
+def compound_spirograph_3d_points(size, R1, R2, r, d, tilt_x, tilt_y, scale=1.0, tolerance=TOLERANCE):
+    rotated_curve, curve, projection = compound_spirograph_3d_curves(size, R1, R2, r, d, tilt_x, tilt_y, scale)
+    with stage("sample"):
+        t, points = adaptive_sample(curve, 0, T_MAX, compound_step(R1, R2, r), tolerance, size)
+    count("points", len(points))
+    return (np.trunc(points),) + point_shading(rotated_curve, projection, t, max(R1, R2, r, d))
+
+# compound_spirograph_3d_points() coarse to fine, like
+# compound_spirograph_passes(), except that the colors and depths come as a
+# function that computes them, so stages that are never drawn cost no colors
+def compound_spirograph_3d_passes(size, R1, R2, r, d, tilt_x, tilt_y, scale=1.0, tolerance=TOLERANCE,
+                                  preview=None, chunk=None):
+    rotated_curve, curve, projection = compound_spirograph_3d_curves(size, R1, R2, r, d, tilt_x, tilt_y, scale)
+    max_distance = max(R1, R2, r, d)
+    for result in adaptive_passes(curve, 0, T_MAX, compound_step(R1, R2, r), tolerance, size,
+                                  preview=preview, chunk=chunk):
+        if result is None:
+            yield None
+        else:
+            t, points = result
+            yield np.trunc(points), lambda t=t: point_shading(rotated_curve, projection, t, max_distance)
+
+# Colors and depths of the points of a 3D curve at t. The color is based on
+# 3D position and time (max_distance is used for color normalization).
+def point_shading(rotated_curve, projection, t, max_distance):
+    points = rotated_curve(t)
+    with stage("color"):
+        colors = get_color(*points.T, t, max_distance)
+    with stage("project"):
+        return colors, depth(points, projection)
+
+# Wire-frame compound spirograph turned `angle` radians about its Z axis;
+# returns the projected points and their depths
+def wireframe_points(size, R1, R2, r, d, angle, scale=1.0):
+    t = np.linspace(0, 2 * np.pi, 1000)
+
+    # Create 3D points
+    with stage("curve"):
+        points = np.column_stack((compound(R1, R2, r, d, t), np.zeros(len(t))))
+    count("points", len(points))
+
+    # Rotate the model (the transpose of Rx(0.5) Ry(0.5) Rz(angle), since the
+    # points used to be multiplied as row vectors), then project onto the
+    # center of the screen
+    model = rotation_z(-angle) @ rotation_y(-0.5) @ rotation_x(-0.5)
+    mvp = perspective(WIREFRAME_FOCAL, scale, (size[0] / 2, size[1] / 2)) @ model
+
+    # Project 3D points to 2D
+    with stage("project"):
+        return project(points, mvp), depth(points, mvp)
+
+def draw_curve(surface, points, color=(255, 255, 255)):
+    if len(points) > 1:
+        with stage("draw"):
+            # Runs share their end points, so the pixels are the same as one call
+            for start in range(0, len(points) - 1, DRAW_RUN):
+                pygame.draw.lines(surface, color, False, points[start:start + DRAW_RUN + 1], 1)
+
+# Depth-tested curve (see raster.draw_depth_polyline): `depths` from
+# camera.depth, `colors` one color or one per point
+def draw_depth_curve(surface, points, depths, colors=(255, 255, 255), width=1, fog=0.0):
+    with stage("draw"):
+        draw_depth_polyline(surface, points, depths, colors, width, fog)
+
+# Quick stand-in for a colored draw_depth_curve: the curve is cut into `bands` runs,
+# each drawn by pygame in a single color
+def draw_banded_curve(surface, points, colors, bands=64):
+    with stage("draw"):
+        edges = np.linspace(0, len(points) - 1, min(bands, len(points) - 1) + 1).astype(int)
+        for start, stop in zip(edges[:-1], edges[1:]):
+            color = colors[(start + stop) // 2]
+            pygame.draw.lines(surface, color, False, points[start:stop + 1], 2)
+
+# The curve and its spokes to the center are depth-tested together, so the
+# near side of the model hides the far side
+def draw_wireframe(surface, points, depths, fog=0.0):
+    with stage("draw"):
+        width, height = surface.get_size()
+        num_connections = 50
+        spokes = np.arange(0, len(points), len(points) // num_connections)
+
+        # The spirograph, then connecting lines to the center of the model
+        # (which projects onto the center of the screen at depth 1) to create a
+        # wire-frame effect
+        p0 = np.concatenate((points[:-1], points[spokes]))
+        p1 = np.concatenate((points[1:], np.broadcast_to((width / 2, height / 2), (len(spokes), 2))))
+        depth0 = np.concatenate((depths[:-1], depths[spokes]))
+        depth1 = np.concatenate((depths[1:], np.ones(len(spokes))))
+        colors = np.repeat([(255, 255, 255), (100, 100, 255)], [len(points) - 1, len(spokes)], axis=0)
+        draw_depth_segments(surface, p0, p1, depth0, depth1, colors, fog=fog)
@@ -1,6 +1,10 @@
+import sys
 import pygame
 import pygame_gui
-import math
+from app_loop import run
+from curve_cache import CurveCache
+from scenes import draw_curve, spirograph_passes
+from worker import SWITCH_INTERVAL, CurveWorker
 
 # Initialize Pygame
 pygame.init()
@@ -10,6 +14,10 @@ WIDTH, HEIGHT = 800, 600
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Interactive Spirograph")
 
+# Max distance in pixels between the curve and the drawn lines;
+# larger values draw fewer vertices
+TOLERANCE = 0.25
+
 # Set up the UI manager
 manager = pygame_gui.UIManager((WIDTH, HEIGHT))
 
@@ -47,47 +55,33 @@ pygame_gui.elements.UILabel(
     manager=manager
 )
 
-# Function to draw the spirograph
-def draw_spirograph(R, r, d):
-    points = []
-    t = 0
-    while t < 200 * math.pi:  # Adjust for more or fewer rotations
-        x = (R - r) * math.cos(t) + d * math.cos((R - r) * t / r)
-        y = (R - r) * math.sin(t) - d * math.sin((R - r) * t / r)
-        points.append((x + WIDTH // 2, y + HEIGHT // 2))
-        t += 0.01
-    
-    if len(points) > 1:
-        pygame.draw.lines(screen, (255, 255, 255), False, points, 1)
-
-# Main game loop
-clock = pygame.time.Clock()
-is_running = True
-
-while is_running:
-    time_delta = clock.tick(60) / 1000.0
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            is_running = False
-
-        manager.process_events(event)
+# Points of the spirograph, centred on the screen, coarse to fine
+def spirograph_curve(R, r, d, preview=None, chunk=None):
+    return spirograph_passes((WIDTH, HEIGHT), R, r, d, tolerance=TOLERANCE, preview=preview, chunk=chunk)
 
-    manager.update(time_delta)
+# Finished curves and their rendered surfaces, keyed on the slider values
+curve_cache = CurveCache((WIDTH, HEIGHT))
+# Curves are sampled and drawn on a background thread, so the sliders stay
+# responsive; a coarse preview comes first and is refined as it goes. The
+# GIL is handed between the threads more often than the default.
+sys.setswitchinterval(SWITCH_INTERVAL)
+worker = CurveWorker(spirograph_curve, draw_curve, (WIDTH, HEIGHT), curve_cache)
 
-    # Clear the screen
-    screen.fill((0, 0, 0))
-
-    # Get current parameter values
-    R = R_slider.get_current_value()
-    r = r_slider.get_current_value()
-    d = d_slider.get_current_value()
-
-    # Draw the spirograph
-    draw_spirograph(R, r, d)
-
-    manager.draw_ui(screen)
-
-    pygame.display.update()
-
-pygame.quit()
\ No newline at end of file
+# Function to draw the spirograph; returns True until it is complete
+def draw_spirograph(R, r, d):
+    # The curve surfaces are opaque, so blitting one also clears the screen
+    return worker.draw(screen, (R, r, d))
+
+# Current parameter values
+def slider_values():
+    return (
+        R_slider.get_current_value(),
+        r_slider.get_current_value(),
+        d_slider.get_current_value(),
+    )
+
+# Main game loop; the scene is redrawn only when a slider moves
+run(screen, manager, slider_values, draw_spirograph)
+
+worker.close()
+pygame.quit()
@@ -0,0 +1,272 @@
+import argparse
+import os
+import numpy as np
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from curves import DT, compound, compound_period, hypotrochoid, hypotrochoid_period
+from scenes import BASE_SIZE, FLAT_SCENES, SCENES
+
+# Export the 2D spirographs as SVG, or as G-code or HPGL for pen plotters.
+# The curve is sampled densely, a chunk at a time, and every chunk is
+# simplified with Ramer-Douglas-Peucker and written out straight away, so
+# memory stays bounded however long the curve is and the file holds only
+# the vertices needed to stay within the tolerance of the curve. With
+# --smooth the vertices are joined by cubic Beziers that follow the curve,
+# which needs far fewer of them than straight segments.
+
+# Largest distance allowed between the exported path and the curve, in the
+# output's units (px for SVG, mm for plotters)
+TOLERANCE = {"svg": 0.1, "gcode": 0.02, "hpgl": 0.02}
+FORMATS = {".svg": "svg", ".gcode": "gcode", ".nc": "gcode", ".hpgl": "hpgl", ".plt": "hpgl"}
+# Spacing in t of the curve samples that are simplified. The scripts' DT puts
+# points several px apart, which is too coarse to stand for the curve itself.
+SAMPLE_DT = DT / 16
+# Curve samples simplified and written at a time
+CHUNK = 1 << 16
+# HPGL plotter units per mm
+HPGL_UNITS = 40
+
+# The scene's curve around (0, 0) as a function of t, and its period
+def scene_curve(scene, params):
+    p = params
+    if scene == "spirograph":
+        return (lambda t: hypotrochoid(p["R"], p["r"], p["d"], t)), hypotrochoid_period(p["R"], p["r"])
+    return (lambda t: compound(p["R1"], p["R2"], p["r"], p["d"], t)), compound_period(p["R1"], p["R2"], p["r"])
+
+# Samples of curve(t) over one period, `dt` apart, in chunks of at most
+# `chunk` points; each chunk starts with the last point of the one before.
+# Every chunk has at least 3 points, which np.gradient(edge_order=2) needs:
+# a shorter tail is folded into the chunk before it, making that one longer
+# by a point.
+def sample_chunks(curve, period, dt, chunk=CHUNK):
+    steps = max(2, int(np.ceil(period / dt)))
+    start = 0
+    while start < steps:
+        stop = min(start + chunk - 1, steps)
+        if steps - stop < 2:
+            stop = steps
+        yield curve(np.arange(start, stop + 1) * (period / steps))
+        start = stop
+
+# Indices of the points to keep, by Ramer-Douglas-Peucker: keep the
+# endpoints, then split every span at its point farthest from the span's
+# chord until no point is further than `tolerance` from it. All spans of a
+# level are split in one batch.
+#
+# With `velocity` (the derivative of the points per sample), a span stands
+# for the cubic Hermite curve between its ends instead of the chord, and a
+# point's distance is to where that curve is at the point's t; see
+# bezier_controls().
+def simplify(points, tolerance, velocity=None):
+    count = len(points)
+    keep = np.zeros(count, dtype=bool)
+    keep[[0, -1]] = True
+    starts, ends = np.array([0]), np.array([count - 1])
+    while len(starts):
+        inner = ends - starts - 1
+        starts, ends, inner = starts[inner > 0], ends[inner > 0], inner[inner > 0]
+        if not len(starts):
+            break
+
+        # Distance of every inner point of every span to the span's chord or curve
+        first = np.cumsum(inner) - inner
+        span = np.repeat(np.arange(len(starts)), inner)
+        index = np.arange(inner.sum()) - first[span] + starts[span] + 1
+        start, end = starts[span], ends[span]
+        if velocity is None:
+            chord = points[end] - points[start]
+            offset = points[index] - points[start]
+            length = np.hypot(chord[:, 0], chord[:, 1])
+            cross = np.abs(chord[:, 0] * offset[:, 1] - chord[:, 1] * offset[:, 0])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                distance = np.where(length > 0, cross / length, np.hypot(offset[:, 0], offset[:, 1]))
+        else:
+            steps = (end - start)[:, None]
+            u = (index - start)[:, None] / steps
+            u2, u3 = u * u, u * u * u
+            curve = ((2 * u3 - 3 * u2 + 1) * points[start] + (u3 - 2 * u2 + u) * velocity[start] * steps
+                     + (3 * u2 - 2 * u3) * points[end] + (u3 - u2) * velocity[end] * steps)
+            offset = points[index] - curve
+            distance = np.hypot(offset[:, 0], offset[:, 1])
+
+        # The first point at each span's largest distance
+        peak = np.maximum.reduceat(distance, first)
+        at_peak = np.flatnonzero(distance == peak[span])
+        at_peak = at_peak[np.r_[True, np.diff(span[at_peak]) != 0]]
+        split = peak > tolerance
+        farthest = index[at_peak][split]
+        keep[farthest] = True
+        starts = np.concatenate((starts[split], farthest))
+        ends = np.concatenate((farthest, ends[split]))
+    return np.flatnonzero(keep)
+
+# Cubic Bezier control points of the segments between the kept points
+# `index`: the Hermite curves simplify() measured, which leave and reach
+# every vertex along the curve's own tangent
+def bezier_controls(points, velocity, index):
+    steps = np.diff(index)[:, None] / 3
+    return points[index[:-1]] + velocity[index[:-1]] * steps, points[index[1:]] - velocity[index[1:]] * steps
+
+def format_points(points, precision, separator=","):
+    return " ".join(f"{x:.{precision}f}{separator}{y:.{precision}f}" for x, y in points)
+
+# Writers take the path in chunks: every chunk continues the path from the
+# last point of the one before, which it repeats. `controls`, if given, are
+# the two Bezier control points of every segment.
+
+class SvgWriter:
+    def __init__(self, file, size, precision=2):
+        self.file = file
+        self.precision = precision
+        self.started = False
+        width, height = size
+        file.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}" height="{height:g}" '
+                   f'viewBox="0 0 {width:g} {height:g}">\n'
+                   f'<path fill="none" stroke="black" stroke-width="1" d="')
+
+    def write(self, points, controls=None):
+        if not self.started:
+            self.file.write("M" + format_points(points[:1], self.precision))
+            self.started = True
+        if controls is None:
+            self.file.write("\nL" + format_points(points[1:], self.precision))
+        else:
+            segments = np.stack((controls[0], controls[1], points[1:]), axis=1).reshape(-1, 2)
+            self.file.write("\nC" + format_points(segments, self.precision))
+
+    def finish(self):
+        self.file.write('"/>\n</svg>\n')
+
+# Bezier segments are written as G5 moves (LinuxCNC, or Marlin with
+# BEZIER_CURVE_SUPPORT), whose I J and P Q are the control points relative
+# to the segment's start and end
+class GcodeWriter:
+    def __init__(self, file, feed, pen_up, pen_down, precision=3):
+        self.file = file
+        self.feed = feed
+        self.pen_up, self.pen_down = pen_up, pen_down
+        self.precision = precision
+        self.started = False
+        file.write(f"G21 ; mm\nG90 ; absolute positions\n{pen_up}\n")
+
+    def write(self, points, controls=None):
+        p = self.precision
+        if not self.started:
+            x, y = points[0]
+            self.file.write(f"G0 X{x:.{p}f} Y{y:.{p}f}\n{self.pen_down}\nG1 F{self.feed:g}\n")
+            self.started = True
+        if controls is None:
+            self.file.writelines(f"G1 X{x:.{p}f} Y{y:.{p}f}\n" for x, y in points[1:])
+            return
+        first = controls[0] - points[:-1]
+        second = controls[1] - points[1:]
+        self.file.writelines(
+            f"G5 I{i:.{p}f} J{j:.{p}f} P{q:.{p}f} Q{r:.{p}f} X{x:.{p}f} Y{y:.{p}f}\n"
+            for (i, j), (q, r), (x, y) in zip(first, second, points[1:])
+        )
+
+    def finish(self):
+        self.file.write(f"{self.pen_up}\n")
+
+class HpglWriter:
+    def __init__(self, file):
+        self.file = file
+        self.started = False
+        file.write("IN;SP1;")
+
+    def write(self, points, controls=None):
+        units = np.rint(points * HPGL_UNITS).astype(int)
+        if not self.started:
+            self.file.write(f"PU{units[0, 0]},{units[0, 1]};")
+            self.started = True
+        self.file.write("\nPD" + format_points(units[1:], 0) + ";")
+
+    def finish(self):
+        self.file.write("\nPU;SP0;\n")
+
+# Write the scene's curve to `path` with `writer(file)`, `place` mapping the
+# curve's points to output units; `smooth` writes Bezier segments. Returns
+# the number of curve samples and of vertices written.
+def export(path, scene, params, writer, place, tolerance, smooth=False, dt=SAMPLE_DT):
+    curve, period = scene_curve(scene, params)
+    samples = vertices = 0
+    with open(path, "w") as f:
+        out = writer(f)
+        for chunk in sample_chunks(curve, period, dt):
+            points = place(chunk)
+            if smooth:
+                velocity = np.gradient(points, axis=0, edge_order=2)
+                index = simplify(points, tolerance, velocity)
+                out.write(points[index], bezier_controls(points, velocity, index))
+            else:
+                index = simplify(points, tolerance)
+                out.write(points[index])
+            samples += len(points) - (samples > 0)
+            vertices += len(index) - (vertices > 0)
+        out.finish()
+    return samples, vertices
+
+def parse_size(text):
+    width, _, height = text.partition("x")
+    return float(width), float(height)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export a spirograph as SVG, or as G-code or HPGL for a pen plotter, "
+                    "simplified to a tolerance."
+    )
+    parser.add_argument("scene", choices=FLAT_SCENES)
+    parser.add_argument("output", help="file to write; .svg, .gcode/.nc or .hpgl/.plt")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())), help="default: from the extension")
+    for name in ["R", "R1", "R2", "r", "d"]:
+        parser.add_argument(f"--{name}", type=float, help="default: the script's slider start value")
+    parser.add_argument("--tolerance", type=float,
+                        help="largest deviation from the curve, in px for SVG and mm for plotters "
+                             f"(default {TOLERANCE['svg']} px, {TOLERANCE['gcode']} mm)")
+    parser.add_argument("--smooth", action="store_true",
+                        help="cubic Beziers instead of straight segments, for fewer vertices "
+                             "(SVG, and G-code as G5; not HPGL)")
+    parser.add_argument("--size", type=parse_size, default=BASE_SIZE, help="SVG size in px (default 800x600)")
+    parser.add_argument("--plot-size", type=parse_size, default=(200.0, 150.0),
+                        help="plotter drawing area in mm (default 200x150)")
+    parser.add_argument("--feed", type=float, default=3000, help="G-code drawing speed in mm/min")
+    parser.add_argument("--pen-up", default="G0 Z2", help="G-code that lifts the pen")
+    parser.add_argument("--pen-down", default="G1 Z0 F500", help="G-code that lowers the pen")
+    parser.add_argument("--dt", type=float, default=SAMPLE_DT, help="spacing of the curve samples in t")
+    args = parser.parse_args()
+
+    output_format = args.format or FORMATS.get(os.path.splitext(args.output)[1].lower())
+    if output_format is None:
+        parser.error("unknown output extension; use --format")
+    if args.smooth and output_format == "hpgl":
+        parser.error("--smooth needs SVG or G-code output")
+    params = {name: getattr(args, name) if getattr(args, name) is not None else value
+              for name, value in SCENES[args.scene].items()}
+    tolerance = args.tolerance if args.tolerance is not None else TOLERANCE[output_format]
+
+    # The scripts center the curve on the window; plotters count y upwards
+    if output_format == "svg":
+        width, height = args.size
+        scale = min(width / BASE_SIZE[0], height / BASE_SIZE[1])
+        center = np.array([width // 2, height // 2])
+        place = lambda points: points * scale + center
+        writer = lambda f: SvgWriter(f, args.size)
+    else:
+        width, height = args.plot_size
+        scale = min(width / BASE_SIZE[0], height / BASE_SIZE[1])
+        center = np.array([width / 2, height / 2])
+        place = lambda points: points * (scale, -scale) + center
+        if output_format == "gcode":
+            writer = lambda f: GcodeWriter(f, args.feed, args.pen_up, args.pen_down)
+        else:
+            writer = HpglWriter
+
+    samples, vertices = export(args.output, args.scene, params, writer, place, tolerance,
+                               args.smooth, args.dt)
+    print(f"Wrote {vertices} vertices for {samples} curve samples ({samples / vertices:.0f}x fewer), "
+          f"{os.path.getsize(args.output) / 1024:.0f} KiB, to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import threading
+from progressive import ProgressiveCurve
+
+# ProgressiveCurve run on a background thread, so the main loop keeps
+# handling the sliders however long a curve takes to sample and draw.
+#
+# The main thread only says which key it wants and blits the surface the
+# worker last published. The worker samples and draws every stage onto a
+# fresh surface of its own (the back buffer) and then publishes it by
+# replacing the single `front` reference, which the main thread reads once
+# per frame: the swap is atomic and a half-drawn surface is never shown.
+# When the key changes, the work for the old one is dropped after at most
+# one refine step (about BUDGET_MS of sampling).
+#
+# The curves here are NumPy work, which shares one core well with the UI
+# thread; pygame's drawing keeps the GIL, which is why draw_curve draws in
+# runs (scenes.DRAW_RUN).
+
+# How often, in seconds, Python should hand the GIL between threads that
+# want it; scripts with a worker set it with sys.setswitchinterval() at
+# startup. The default of 5 ms lets the worker hold up a frame that should
+# start now.
+SWITCH_INTERVAL = 0.001
+
+class CurveWorker(ProgressiveCurve):
+    def __init__(self, passes, render, size, cache=None, quick_render=None, **kwargs):
+        super().__init__(passes, render, size, cache, quick_render, **kwargs)
+        self.wanted = None  # Key last asked for by draw()
+        self.front = None  # (key, surface, finished) last published
+        self.error = None  # Exception that stopped the worker
+        self.running = True
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.work, name="curve worker", daemon=True)
+        self.thread.start()
+
+    # Ask for the curve for `key` and blit the latest published surface onto
+    # `target`, which may still be an earlier key's curve or an unfinished
+    # stage; returns True until the finished curve for `key` is shown
+    def draw(self, target, key):
+        if self.error is not None:
+            raise self.error
+        if key != self.wanted:
+            with self.condition:
+                self.wanted = key
+                self.condition.notify()
+        front = self.front
+        if front is not None:
+            target.blit(front[1], (0, 0))
+        return front is None or front[0] != key or not front[2]
+
+    def work(self):
+        try:
+            while True:
+                with self.condition:
+                    while self.running and self.wanted == self.key and self.stages is None:
+                        self.condition.wait()
+                    if not self.running:
+                        return
+                    key = self.wanted
+                if key != self.key:
+                    self.start(key)  # Drops the stages left for the old key
+                else:
+                    self.refine()
+                self.front = (self.key, self.surface, self.stages is None)
+        except Exception as error:
+            self.error = error
+
+    # Stop the worker thread, e.g. before pygame.quit()
+    def close(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.thread.join()